@@ -284,9 +284,9 @@ class BacktestEngine:
         trade_record = TradeRecord(
             timestamp=timestamp,
             direction=signal.direction,
-            price=signal.price,
-            size=trade_size,
-            pnl=Decimal(0)  # 开仓时盈亏为0
+            price=float(signal.price),
+            size=float(trade_size),
+            pnl=0.0  # 开仓时盈亏为0
         )
         self.trades.append(trade_record)
         self.signals_executed += 1
@@ -315,9 +315,9 @@ class BacktestEngine:
         trade_record = TradeRecord(
             timestamp=timestamp,
             direction=direction,
-            price=price,
-            size=trade_size,
-            pnl=pnl
+            price=float(price),
+            size=float(trade_size),
+            pnl=float(pnl)
         )
         self.trades.append(trade_record)
         
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试脚本共用的数据缓存：把解析好的float列缓存到数据目录下，源文件未变化时直接读取，跳过JSON解析
+
+缓存文件格式（与Python版本无关）：
+    第一行  缓存键（JSON：格式版本 + 各源文件的文件名、修改时间、大小）
+    第二行  记录数n
+    之后    各列依次存放n个小端序double
+"""
+
+import os
+import sys
+import json
+from array import array
+from pathlib import Path
+
+CACHE_DIR_NAME = ".edgex_cache"  # 所有缓存文件集中放在数据目录下的这个子目录中
+CACHE_FORMAT_VERSION = 1
+
+
+def cache_path(data_dir, name):
+    """返回数据目录下名为name的缓存文件路径"""
+    return Path(data_dir) / CACHE_DIR_NAME / name
+
+
+def cache_key(file_paths):
+    """由源文件（Path或os.DirEntry）的文件名、修改时间和大小生成缓存键"""
+    entries = []
+    for p in file_paths:
+        st = p.stat()
+        entries.append([p.name, st.st_mtime_ns, st.st_size])
+    return json.dumps({'version': CACHE_FORMAT_VERSION, 'files': entries})
+
+
+def load_columns(path, key, ncols):
+    """读取ncols个array('d')列，缓存不存在、已过期或损坏时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            if f.readline().decode('utf-8').rstrip('\n') != key:
+                return None
+            n = int(f.readline())
+            columns = tuple(array('d') for _ in range(ncols))
+            for col in columns:
+                col.fromfile(f, n)
+                if sys.byteorder == 'big':
+                    col.byteswap()
+            return columns
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def save_columns(path, key, columns):
+    """写入各列（先写临时文件再替换），写入失败只打印警告"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(f"{key}\n{len(columns[0])}\n".encode('utf-8'))
+            for col in columns:
+                if sys.byteorder == 'big':
+                    col = array('d', col)
+                    col.byteswap()
+                col.tofile(f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] 写入缓存失败 {path.name}: {e}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试脚本共用的辅助函数：.env加载（同一进程内只查找、解析一次）和事件循环启动"""
+
+import sys
+import asyncio
+import functools
+from pathlib import Path
+
+ENV_FILE = Path(__file__).parent / ".env"
+
+
+@functools.lru_cache(maxsize=None)
+def load_env():
+    """加载scripts/test/.env，返回是否找到该文件（结果缓存，重复调用不再读文件）"""
+    if not ENV_FILE.exists():
+        return False
+    import dotenv  # 仅在存在.env文件时才导入
+    dotenv.load_dotenv(ENV_FILE)
+    return True
+
+
+def run(main):
+    """运行异步入口函数main()并返回其结果
+    
+    Linux/macOS上优先使用uvloop事件循环；未安装（或Windows）时回退到默认循环
+    """
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    if uvloop is not None and sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(main())
+    if uvloop is not None:
+        uvloop.install()
+    return asyncio.run(main())
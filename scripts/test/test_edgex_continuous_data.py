@@ -13,7 +13,7 @@ from pathlib import Path
 from decimal import Decimal
 from datetime import datetime
 from edgex_sdk import Client, WebSocketManager
-import dotenv
+from _env import ENV_FILE, load_env
 
 # 设置输出编码为UTF-8
 if sys.platform == 'win32':
@@ -23,12 +23,10 @@ if sys.platform == 'win32':
 
 # 加载.env文件
 project_root = Path(__file__).parent
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
-    print(f"[INFO] 已加载 .env 文件: {env_file}\n")
+if load_env():
+    print(f"[INFO] 已加载 .env 文件: {ENV_FILE}\n")
 else:
-    print(f"[WARNING] 未找到 .env 文件: {env_file}")
+    print(f"[WARNING] 未找到 .env 文件: {ENV_FILE}")
     print("   将使用系统环境变量\n")
 
 # 全局变量用于优雅退出
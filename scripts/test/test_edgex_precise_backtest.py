@@ -8,9 +8,19 @@ import json
 import time
 from pathlib import Path
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timezone
+from array import array
 from collections import deque
-import dotenv
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from _env import load_env
+
+# 优先使用orjson解析大文件（更快），未安装时回退到标准库json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # 设置输出编码为UTF-8
 if sys.platform == 'win32':
@@ -20,14 +30,22 @@ if sys.platform == 'win32':
 
 # 加载.env文件
 project_root = Path(__file__).parent
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
+load_env()
+
+# 是否输出逐笔交易/止损止盈明细（BT_VERBOSE=1 开启），关闭时循环内不构造这些字符串
+VERBOSE = os.environ.get('BT_VERBOSE', '0') == '1'
 
 
 class PreciseOrderFlowStrategy:
     """精确的订单流策略，用于回测"""
     
+    # 每个tick都会读写实例属性，使用__slots__避免__dict__查找
+    __slots__ = (
+        'tick_size', 'position_size', 'imbalance_threshold',
+        'price_history', 'bid_history', 'ask_history', 'spread_history',
+        'best_bid', 'best_ask', 'mid_price', 'spread',
+    )
+    
     def __init__(self, tick_size, position_size=Decimal('0.1'), imbalance_threshold=0.3):
         self.tick_size = tick_size
         self.position_size = position_size
@@ -47,15 +65,23 @@ class PreciseOrderFlowStrategy:
         
     def update_market_data(self, best_bid, best_ask, mid_price):
         """更新市场数据"""
-        self.best_bid = Decimal(str(best_bid))
-        self.best_ask = Decimal(str(best_ask))
-        self.mid_price = Decimal(str(mid_price))
-        self.spread = self.best_ask - self.best_bid
-        
-        self.price_history.append(self.mid_price)
-        self.bid_history.append(self.best_bid)
-        self.ask_history.append(self.best_ask)
-        self.spread_history.append(self.spread)
+        self.update_and_signal(best_bid, best_ask, mid_price, check_signal=False)
+    
+    def update_and_signal(self, best_bid, best_ask, mid_price, check_signal=True):
+        """更新市场数据并按需生成交易信号（回测主循环每个tick只需调用这一个方法）"""
+        self.best_bid = bid = Decimal(str(best_bid))
+        self.best_ask = ask = Decimal(str(best_ask))
+        self.mid_price = mid = Decimal(str(mid_price))
+        self.spread = spread = ask - bid
+        
+        self.price_history.append(mid)
+        self.bid_history.append(bid)
+        self.ask_history.append(ask)
+        self.spread_history.append(spread)
+        
+        if not check_signal:
+            return None
+        return self.generate_signal()
     
     def calculate_imbalance(self):
         """计算订单簿失衡（基于价格趋势、价差和波动）"""
@@ -63,22 +89,25 @@ class PreciseOrderFlowStrategy:
             return 0.0
         
         # 1. 价格趋势（短期动量）
-        recent_prices = list(self.price_history)[-5:]
-        price_trend = float((recent_prices[-1] - recent_prices[0]) / Decimal(str(recent_prices[0]))) if recent_prices[0] > 0 else 0
+        # 直接按下标访问deque两端，避免每次复制成list再切片
+        first_price = self.price_history[-5]
+        price_trend = float((self.price_history[-1] - first_price) / first_price) if first_price > 0 else 0
         
         # 2. 价差变化（价差缩小可能表示失衡）
         if len(self.spread_history) >= 3:
-            recent_spreads = list(self.spread_history)[-3:]
-            spread_change = float((recent_spreads[0] - recent_spreads[-1]) / Decimal(str(recent_spreads[0]))) if recent_spreads[0] > 0 else 0
+            first_spread = self.spread_history[-3]
+            spread_change = float((first_spread - self.spread_history[-1]) / first_spread) if first_spread > 0 else 0
         else:
             spread_change = 0
         
         # 3. 价格波动率（波动大时可能失衡）
         price_volatility = 0.0
         if len(self.price_history) >= 3:
+            # 只计算最近5次价格变动
+            n = len(self.price_history)
             price_changes = [abs(float((self.price_history[i] - self.price_history[i-1]) / self.price_history[i-1])) 
-                           for i in range(1, len(self.price_history))]
-            price_volatility = sum(price_changes[-5:]) / min(5, len(price_changes)) if price_changes else 0
+                           for i in range(max(1, n - 5), n)]
+            price_volatility = sum(price_changes) / len(price_changes) if price_changes else 0
         
         # 4. 买卖价差比例（价差小可能表示失衡）
         spread_pct = float(self.spread / self.mid_price) if self.mid_price > 0 else 0
@@ -131,6 +160,7 @@ class PreciseOrderFlowStrategy:
                 'strength': strength,
                 'imbalance': imbalance,
                 'price': float(exec_price),
+                '_price_dec': exec_price,  # 原始Decimal价格，供回测引擎直接使用
                 'best_bid': float(self.best_bid),
                 'best_ask': float(self.best_ask),
                 'spread': float(self.spread)
@@ -142,6 +172,17 @@ class PreciseOrderFlowStrategy:
 class PreciseBacktestEngine:
     """精确回测引擎"""
     
+    __slots__ = (
+        'strategy', 'initial_capital', 'fee_rate', 'stop_loss_pct', 'take_profit_pct',
+        'cash', 'position', 'avg_entry_price',
+        '_avg_entry_price_f', '_sl_f', '_tp_f', '_size_times_fee_rate',
+        'trades', 'equity_timestamps', 'equity_values', 'equity_cash', 'equity_positions',
+        'equity_record_interval', '_last_equity_ts', '_last_equity_trades',
+        'total_trades', 'winning_trades', 'losing_trades', 'total_profit',
+        'max_drawdown', 'peak_equity', 'total_fees',
+        'stop_loss_triggered', 'take_profit_triggered',
+    )
+    
     def __init__(self, strategy, initial_capital=Decimal('10000'), fee_rate=Decimal('0.0005'),
                  stop_loss_pct=Decimal('0.02'), take_profit_pct=Decimal('0.01')):
         self.strategy = strategy
@@ -155,9 +196,26 @@ class PreciseBacktestEngine:
         self.position = Decimal(0)  # 持仓数量（正数=多头，负数=空头）
         self.avg_entry_price = Decimal(0)  # 平均入场价格
         
+        # 止损止盈快速路径使用的浮点副本（avg_entry_price 变化时同步更新）
+        self._avg_entry_price_f = 0.0
+        self._sl_f = float(stop_loss_pct)
+        self._tp_f = float(take_profit_pct)
+        
+        # 每笔交易的下单数量固定，手续费系数可预先算好
+        self._size_times_fee_rate = strategy.position_size * fee_rate
+        
         # 交易记录
         self.trades = []
-        self.equity_curve = []
+        
+        # 权益曲线按列存储（紧凑的double数组，代替每个tick一个dict）
+        self.equity_timestamps = array('d')
+        self.equity_values = array('d')
+        self.equity_cash = array('d')
+        self.equity_positions = array('d')
+        # 权益曲线最多每秒记录一次；发生成交（含止损止盈）后的下一个tick强制记录
+        self.equity_record_interval = 1.0
+        self._last_equity_ts = None
+        self._last_equity_trades = 0
         
         # 统计
         self.total_trades = 0
@@ -175,11 +233,11 @@ class PreciseBacktestEngine:
     def execute_trade(self, signal, current_price, timestamp):
         """执行交易（支持双向交易）"""
         direction = signal['direction']
-        exec_price = Decimal(str(signal['price']))
+        exec_price = signal['_price_dec']
         size = self.strategy.position_size
         
         # 计算手续费
-        fee = exec_price * size * self.fee_rate
+        fee = exec_price * self._size_times_fee_rate
         
         if direction == 'buy':
             # 买入（开多或平空）
@@ -232,6 +290,7 @@ class PreciseBacktestEngine:
                 }
                 self.trades.append(trade)
                 self.total_trades += 1
+                self._avg_entry_price_f = float(self.avg_entry_price)
                 return True
         
         else:  # sell
@@ -286,6 +345,7 @@ class PreciseBacktestEngine:
             }
             self.trades.append(trade)
             self.total_trades += 1
+            self._avg_entry_price_f = float(self.avg_entry_price)
             return True
         
         return False
@@ -295,43 +355,40 @@ class PreciseBacktestEngine:
         position_value = Decimal(str(current_price)) * self.position
         return self.cash + position_value
     
-    def check_stop_loss_take_profit(self, current_price, timestamp):
-        """检查是否需要止损或止盈，如果需要则自动平仓"""
-        if self.position == 0 or self.avg_entry_price == 0:
+    def check_stop_loss_take_profit(self, current_price, timestamp, current_price_dec=None):
+        """检查是否需要止损或止盈，如果需要则自动平仓
+        
+        current_price_dec: 调用方已有的Decimal价格，平仓时直接使用，避免重复转换
+        """
+        if self.position == 0 or self._avg_entry_price_f == 0:
             return False, None
         
-        current_price_decimal = Decimal(str(current_price))
-        price_change_pct = (current_price_decimal - self.avg_entry_price) / self.avg_entry_price
+        # 用浮点比较判断是否触发，只有真正平仓时才走 Decimal 精确记账
+        entry_price = self._avg_entry_price_f
+        
+        # 按持仓方向取符号后的收益率：多头为价格涨幅，空头为价格跌幅
+        side = 1.0 if self.position > 0 else -1.0
+        signed_pct = (current_price - entry_price) / entry_price * side
         
         should_close = False
         close_reason = ""
         
-        if self.position > 0:  # 多头持仓
-            # 止盈：价格上涨超过止盈百分比
-            if price_change_pct >= self.take_profit_pct:
-                should_close = True
-                close_reason = "TAKE_PROFIT"
-                self.take_profit_triggered += 1
-            # 止损：价格下跌超过止损百分比
-            elif price_change_pct <= -self.stop_loss_pct:
-                should_close = True
-                close_reason = "STOP_LOSS"
-                self.stop_loss_triggered += 1
-        
-        elif self.position < 0:  # 空头持仓
-            # 止盈：价格下跌超过止盈百分比（空头盈利）
-            if price_change_pct <= -self.take_profit_pct:
-                should_close = True
-                close_reason = "TAKE_PROFIT"
-                self.take_profit_triggered += 1
-            # 止损：价格上涨超过止损百分比（空头亏损）
-            elif price_change_pct >= self.stop_loss_pct:
-                should_close = True
-                close_reason = "STOP_LOSS"
-                self.stop_loss_triggered += 1
+        if signed_pct >= self._tp_f:
+            # 止盈：持仓方向上的收益超过止盈百分比
+            should_close = True
+            close_reason = "TAKE_PROFIT"
+            self.take_profit_triggered += 1
+        elif signed_pct <= -self._sl_f:
+            # 止损：持仓方向上的亏损超过止损百分比
+            should_close = True
+            close_reason = "STOP_LOSS"
+            self.stop_loss_triggered += 1
         
         if should_close:
             # 强制平仓
+            if current_price_dec is None:
+                current_price_dec = Decimal(str(current_price))
+            current_price_decimal = current_price_dec
             size = abs(self.position)
             fee = current_price_decimal * size * self.fee_rate
             
@@ -371,6 +428,7 @@ class PreciseBacktestEngine:
             # 清空持仓
             self.position = Decimal(0)
             self.avg_entry_price = Decimal(0)
+            self._avg_entry_price_f = 0.0
             
             return True, close_reason
         
@@ -379,15 +437,18 @@ class PreciseBacktestEngine:
     def update_equity_curve(self, current_price, timestamp):
         """更新权益曲线"""
         equity = self.calculate_equity(current_price)
-        self.equity_curve.append({
-            'timestamp': timestamp,
-            'equity': float(equity),
-            'cash': float(self.cash),
-            'position': float(self.position),
-            'position_value': float(Decimal(str(current_price)) * self.position)
-        })
-        
-        # 更新最大回撤
+        
+        if (self._last_equity_ts is None
+                or timestamp - self._last_equity_ts >= self.equity_record_interval
+                or self.total_trades != self._last_equity_trades):
+            self._last_equity_ts = timestamp
+            self._last_equity_trades = self.total_trades
+            self.equity_timestamps.append(timestamp)
+            self.equity_values.append(float(equity))
+            self.equity_cash.append(float(self.cash))
+            self.equity_positions.append(float(self.position))
+        
+        # 更新最大回撤（每个tick都更新）
         if equity > self.peak_equity:
             self.peak_equity = equity
         
@@ -414,9 +475,9 @@ class PreciseBacktestEngine:
                 avg_loss = sum(losses) / len(losses) if losses else 0
         
         # 计算夏普比率（简化版）
-        if len(self.equity_curve) > 1:
-            returns = [(self.equity_curve[i]['equity'] - self.equity_curve[i-1]['equity']) / self.equity_curve[i-1]['equity']
-                      for i in range(1, len(self.equity_curve))]
+        equity_values = self.equity_values
+        if len(equity_values) > 1:
+            returns = [(cur - prev) / prev for prev, cur in zip(equity_values, equity_values[1:])]
             if returns:
                 avg_return = sum(returns) / len(returns)
                 variance = sum((r - avg_return) ** 2 for r in returns) / len(returns)
@@ -449,32 +510,54 @@ class PreciseBacktestEngine:
         }
 
 
+def _parse_data_file(file_path):
+    """解析单个数据文件，只保留报价有效的ETH数据
+    
+    返回 (rows, error)，可在子进程中执行；文件中途出错时整个文件不贡献任何数据
+    """
+    rows = []
+    try:
+        records = _json_loads(file_path.read_bytes())
+        if isinstance(records, list):
+            for r in records:
+                if r.get('contract_name') != 'ETHUSD':
+                    continue
+                row = (r.get('unix_time', 0), r.get('best_bid', 0), r.get('best_ask', 0), r.get('mid_price', 0))
+                if row[1] > 0 and row[2] > 0 and row[3] > 0:
+                    rows.append(row)
+    except Exception as e:
+        return [], str(e)
+    return rows, None
+
+
 def load_historical_data(data_dir):
-    """加载历史数据文件"""
+    """加载历史数据文件
+    
+    返回按时间排序的 (unix_time, best_bid, best_ask, mid_price) 元组列表
+    """
     data_dir = Path(data_dir)
     if not data_dir.exists():
         return []
     
-    all_records = []
-    
     # 读取所有非final文件
-    for file_path in sorted(data_dir.glob("edgex_continuous_*.json")):
-        if "final" in file_path.name:
-            continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                records = json.load(f)
-                if isinstance(records, list):
-                    all_records.extend(records)
-        except Exception as e:
-            print(f"[WARNING] 读取文件失败 {file_path.name}: {e}")
+    file_paths = [p for p in sorted(data_dir.glob("edgex_continuous_*.json")) if "final" not in p.name]
     
-    # 按时间排序
-    all_records.sort(key=lambda x: x.get('unix_time', 0))
+    # 多个文件时并行解析（每个文件的JSON解析相互独立）
+    if len(file_paths) > 1:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_parse_data_file, file_paths))
+    else:
+        results = [_parse_data_file(p) for p in file_paths]
     
-    # 只保留ETH数据
-    eth_records = [r for r in all_records if r.get('contract_name') == 'ETHUSD']
+    eth_records = []
+    for file_path, (rows, error) in zip(file_paths, results):
+        if error is not None:
+            print(f"[WARNING] 读取文件失败 {file_path.name}: {error}")
+            continue
+        eth_records.extend(rows)
+    
+    # 按时间排序（只对ETH记录排序）
+    eth_records.sort(key=itemgetter(0))
     
     return eth_records
 
@@ -496,7 +579,7 @@ def run_precise_backtest():
         return
     
     print(f"[OK] 已加载 {len(historical_records)} 条历史记录")
-    print(f"   时间范围: {datetime.fromtimestamp(historical_records[0]['unix_time'])} 至 {datetime.fromtimestamp(historical_records[-1]['unix_time'])}")
+    print(f"   时间范围: {datetime.fromtimestamp(historical_records[0][0])} 至 {datetime.fromtimestamp(historical_records[-1][0])}")
     print()
     
     # 初始化策略（优化参数以减少交易频率）
@@ -535,71 +618,76 @@ def run_precise_backtest():
     signal_check_interval = 10  # 每10秒检查一次信号（从3秒增加到10秒）
     min_trade_interval = 30  # 最小交易间隔30秒（从5秒增加到30秒）
     
-    last_signal_time = 0
-    last_trade_time = 0
+    # 初始值取负的间隔，保证第一个tick即可通过时间间隔检查
+    last_signal_time = -signal_check_interval
+    last_trade_time = -min_trade_interval
     
-    # 处理历史数据
-    processed = 0
-    for i, record in enumerate(historical_records):
-        timestamp = record.get('unix_time', 0)
-        best_bid = record.get('best_bid', 0)
-        best_ask = record.get('best_ask', 0)
-        mid_price = record.get('mid_price', 0)
-        
-        if best_bid <= 0 or best_ask <= 0 or mid_price <= 0:
-            continue
-        
-        processed += 1
-        
-        # 更新策略市场数据
-        strategy.update_market_data(best_bid, best_ask, mid_price)
+    # 处理历史数据（循环内频繁调用的方法预先绑定为局部变量）
+    update_and_signal = strategy.update_and_signal
+    check_stop_loss_take_profit = backtest.check_stop_loss_take_profit
+    update_equity_curve = backtest.update_equity_curve
+    
+    # 循环内的输出先写入缓冲区，攒够一批再一次性写到stdout
+    log_buf = []
+    
+    def log(msg):
+        log_buf.append(msg)
+        if len(log_buf) >= 1000:
+            flush_log()
+    
+    def flush_log():
+        if log_buf:
+            sys.stdout.write('\n'.join(log_buf) + '\n')
+            log_buf.clear()
+    
+    # 无效报价已在加载时过滤，循环内不再逐条检查
+    for processed, (timestamp, best_bid, best_ask, mid_price) in enumerate(historical_records, 1):
+        # 更新策略市场数据，到了信号检查时间则同时生成信号
+        check_signal = timestamp - last_signal_time >= signal_check_interval
+        signal = update_and_signal(best_bid, best_ask, mid_price, check_signal)
         
         # 检查止损止盈（在更新权益曲线之前）
-        stop_triggered, stop_reason = backtest.check_stop_loss_take_profit(mid_price, timestamp)
-        if stop_triggered:
+        stop_triggered, stop_reason = check_stop_loss_take_profit(mid_price, timestamp, strategy.mid_price)
+        if stop_triggered and VERBOSE:
             equity = backtest.calculate_equity(mid_price)
             return_pct = (equity - initial_capital) / initial_capital * 100
             trade = backtest.trades[-1]
-            print(f"[{stop_reason}] 自动平仓 @ ${mid_price:.2f} | "
-                  f"入场价: ${trade.get('entry_price', 0):.2f} | "
-                  f"PnL: ${trade.get('pnl', 0):+.2f} | "
-                  f"权益: ${equity:.2f} ({return_pct:+.2f}%)")
+            log(f"[{stop_reason}] 自动平仓 @ ${mid_price:.2f} | "
+                f"入场价: ${trade.get('entry_price', 0):.2f} | "
+                f"PnL: ${trade.get('pnl', 0):+.2f} | "
+                f"权益: ${equity:.2f} ({return_pct:+.2f}%)")
         
         # 更新权益曲线
-        backtest.update_equity_curve(mid_price, timestamp)
-        
-        # 检查交易信号
-        time_since_last_signal = timestamp - last_signal_time if last_signal_time > 0 else float('inf')
-        
-        if time_since_last_signal >= signal_check_interval:
-            signal = strategy.generate_signal()
-            
-            if signal and signal['strength'] >= 0.7:  # 提高信号强度要求（从0.5提高到0.7）
-                time_since_last_trade = timestamp - last_trade_time if last_trade_time > 0 else float('inf')
-                
-                if time_since_last_trade >= min_trade_interval:
-                    # 执行交易
-                    if backtest.execute_trade(signal, mid_price, timestamp):
-                        last_trade_time = timestamp
-                        last_signal_time = timestamp
-                        
-                        # 显示交易信息
+        update_equity_curve(mid_price, timestamp)
+        
+        # 检查交易信号（未到检查时间时signal为None）
+        if signal and signal['strength'] >= 0.7:  # 提高信号强度要求（从0.5提高到0.7）
+            if timestamp - last_trade_time >= min_trade_interval:
+                # 执行交易
+                if backtest.execute_trade(signal, mid_price, timestamp):
+                    last_trade_time = timestamp
+                    last_signal_time = timestamp
+                    
+                    # 显示交易信息
+                    if VERBOSE:
                         equity = backtest.calculate_equity(mid_price)
                         return_pct = (equity - initial_capital) / initial_capital * 100
                         trade = backtest.trades[-1]
                         pnl_str = f" | PnL: ${trade.get('pnl', 0):.2f}" if trade.get('pnl') is not None else ""
-                        print(f"[TRADE #{backtest.total_trades}] {signal['direction'].upper()} @ ${signal['price']:.2f} "
-                              f"| 权益: ${equity:.2f} ({return_pct:+.2f}%){pnl_str}")
+                        log(f"[TRADE #{backtest.total_trades}] {signal['direction'].upper()} @ ${signal['price']:.2f} "
+                            f"| 权益: ${equity:.2f} ({return_pct:+.2f}%){pnl_str}")
         
         # 每处理5000个点显示一次进度
         if processed % 5000 == 0:
             equity = backtest.calculate_equity(mid_price)
             return_pct = (equity - initial_capital) / initial_capital * 100
-            print(f"[PROGRESS] 已处理 {processed}/{len(historical_records)} 个数据点 | "
-                  f"交易数: {backtest.total_trades} | 当前权益: ${equity:.2f} | 收益率: {return_pct:+.2f}%")
+            log(f"[PROGRESS] 已处理 {processed}/{len(historical_records)} 个数据点 | "
+                f"交易数: {backtest.total_trades} | 当前权益: ${equity:.2f} | 收益率: {return_pct:+.2f}%")
+    
+    flush_log()
     
     # 计算最终统计
-    final_price = historical_records[-1].get('mid_price', 0)
+    final_price = historical_records[-1][3]
     stats = backtest.get_statistics(final_price)
     
     print("\n" + "=" * 70)
@@ -638,7 +726,7 @@ def run_precise_backtest():
     print()
     
     # 计算年化收益率
-    time_span = historical_records[-1]['unix_time'] - historical_records[0]['unix_time']
+    time_span = historical_records[-1][0] - historical_records[0][0]
     days = time_span / 86400
     if days > 0:
         annual_return = stats['total_return_pct'] * (365 / days)
@@ -661,30 +749,32 @@ def run_precise_backtest():
         print("单日盈亏统计")
         print("=" * 70)
         
-        from collections import defaultdict
-        daily_stats = defaultdict(lambda: {'trades': 0, 'pnl': 0, 'fees': 0, 'winning': 0, 'losing': 0})
+        # 按UTC自然日（epoch天数）分组，只对实际出现的日期做一次格式化
+        daily_stats = {}
         
         for trade in backtest.trades:
-            trade_date = datetime.fromtimestamp(trade['timestamp']).strftime('%Y-%m-%d')
-            daily_stats[trade_date]['trades'] += 1
-            daily_stats[trade_date]['fees'] += trade.get('fee', 0)
+            day = int(trade['timestamp'] // 86400)
+            stats = daily_stats.get(day)
+            if stats is None:
+                stats = daily_stats[day] = {'trades': 0, 'pnl': 0, 'fees': 0, 'winning': 0, 'losing': 0}
+            stats['trades'] += 1
+            stats['fees'] += trade['fee']
             
-            if trade.get('pnl') is not None:
-                daily_stats[trade_date]['pnl'] += trade['pnl']
-                if trade['pnl'] > 0:
-                    daily_stats[trade_date]['winning'] += 1
+            pnl = trade.get('pnl')
+            if pnl is not None:
+                stats['pnl'] += pnl
+                if pnl > 0:
+                    stats['winning'] += 1
                 else:
-                    daily_stats[trade_date]['losing'] += 1
-        
-        # 按日期排序
-        sorted_dates = sorted(daily_stats.keys())
+                    stats['losing'] += 1
         
         print(f"{'日期':<12} {'交易数':<8} {'盈利':<8} {'亏损':<8} {'盈亏':<12} {'手续费':<10} {'胜率':<8}")
         print("-" * 70)
         
         total_daily_pnl = 0
-        for date in sorted_dates:
-            stats = daily_stats[date]
+        for day in sorted(daily_stats):
+            stats = daily_stats[day]
+            date = datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
             total_trades = stats['trades']
             winning = stats['winning']
             losing = stats['losing']
@@ -695,14 +785,17 @@ def run_precise_backtest():
             total_daily_pnl += pnl
             
             pnl_str = f"${pnl:+,.2f}" if pnl != 0 else "$0.00"
-            print(f"{date:<12} {total_trades:<8} {winning:<8} {losing:<8} {pnl_str:<12} ${fees:.2f:<9} {win_rate:.1f}%")
+            fees_str = f"${fees:.2f}"
+            print(f"{date:<12} {total_trades:<8} {winning:<8} {losing:<8} {pnl_str:<12} {fees_str:<10} {win_rate:.1f}%")
         
         print("-" * 70)
+        total_pnl_str = f"${total_daily_pnl:+,.2f}"
+        total_fees_str = f"${sum(s['fees'] for s in daily_stats.values()):.2f}"
         print(f"{'总计':<12} {sum(s['trades'] for s in daily_stats.values()):<8} "
               f"{sum(s['winning'] for s in daily_stats.values()):<8} "
               f"{sum(s['losing'] for s in daily_stats.values()):<8} "
-              f"${total_daily_pnl:+,.2f:<11} "
-              f"${sum(s['fees'] for s in daily_stats.values()):.2f:<9}")
+              f"{total_pnl_str:<12} "
+              f"{total_fees_str:<10}")
         
         print("\n" + "=" * 70)
     
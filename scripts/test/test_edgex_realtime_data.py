@@ -6,10 +6,29 @@ import os
 import sys
 import asyncio
 import json
+import reprlib
+from collections import deque
 from pathlib import Path
-from decimal import Decimal
 from edgex_sdk import Client, WebSocketManager
-import dotenv
+from _env import ENV_FILE, load_env, run
+
+# WebSocket消息优先用orjson解析（C实现，更快），未安装时回退到标准库json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 调试输出用的限宽repr：只生成截断后的内容，不会先拼出整个消息的repr
+_debug_repr = reprlib.Repr()
+_debug_repr.maxlevel = 4
+_debug_repr.maxdict = 6
+_debug_repr.maxlist = 4
+_debug_repr.maxstring = 60
+
+# 深度消息的类型与频道前缀
+_QUOTE_EVENT = "quote-event"
+_DEPTH_PREFIX = "depth."
 
 # 设置输出编码为UTF-8
 if sys.platform == 'win32':
@@ -19,22 +38,28 @@ if sys.platform == 'win32':
 
 # 加载.env文件
 project_root = Path(__file__).parent
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
-    print(f"[INFO] 已加载 .env 文件: {env_file}\n")
+if load_env():
+    print(f"[INFO] 已加载 .env 文件: {ENV_FILE}\n")
 else:
-    print(f"[WARNING] 未找到 .env 文件: {env_file}")
+    print(f"[WARNING] 未找到 .env 文件: {ENV_FILE}")
     print("   将使用系统环境变量\n")
 
+# 启动时一次性读取所需的环境变量（已合并默认值）
+_ENV = {
+    'EDGEX_ACCOUNT_ID': os.environ.get('EDGEX_ACCOUNT_ID'),
+    'EDGEX_STARK_PRIVATE_KEY': os.environ.get('EDGEX_STARK_PRIVATE_KEY'),
+    'EDGEX_BASE_URL': os.environ.get('EDGEX_BASE_URL', 'https://pro.edgex.exchange'),
+    'EDGEX_WS_URL': os.environ.get('EDGEX_WS_URL', 'wss://quote.edgex.exchange'),
+}
+
 async def test_edgex_realtime_data():
     """测试EdgeX实时数据获取"""
     
     # 从环境变量读取配置
-    account_id = os.getenv('EDGEX_ACCOUNT_ID')
-    stark_private_key = os.getenv('EDGEX_STARK_PRIVATE_KEY')
-    base_url = os.getenv('EDGEX_BASE_URL', 'https://pro.edgex.exchange')
-    ws_url = os.getenv('EDGEX_WS_URL', 'wss://quote.edgex.exchange')
+    account_id = _ENV['EDGEX_ACCOUNT_ID']
+    stark_private_key = _ENV['EDGEX_STARK_PRIVATE_KEY']
+    base_url = _ENV['EDGEX_BASE_URL']
+    ws_url = _ENV['EDGEX_WS_URL']
     
     print("=" * 60)
     print("EdgeX 实时数据测试")
@@ -55,114 +80,100 @@ async def test_edgex_realtime_data():
     print()
     
     try:
+        # 账户ID只转换一次，REST和WebSocket客户端共用
+        account_id_int = int(account_id)
+        
         # 初始化EdgeX客户端
         print("[INIT] 正在初始化EdgeX客户端...")
         client = Client(
             base_url=base_url,
-            account_id=int(account_id),
+            account_id=account_id_int,
             stark_private_key=stark_private_key
         )
         
-        # 获取合约列表
-        print("[FETCH] 正在获取合约列表...")
-        response = await client.get_metadata()
-        data = response.get('data', {})
-        contract_list = data.get('contractList', [])
-        
-        if not contract_list:
-            print("[ERROR] 无法获取合约列表")
-            return False
-        
-        # 查找ETH和SOL的合约ID
-        eth_contract = None
-        sol_contract = None
-        
-        for contract in contract_list:
-            contract_name = contract.get('contractName', '')
-            if contract_name == 'ETHUSD':
-                eth_contract = contract
-            elif contract_name == 'SOLUSD':
-                sol_contract = contract
-        
-        print("\n" + "=" * 60)
-        print("合约信息")
-        print("=" * 60)
-        
-        if eth_contract:
-            eth_contract_id = eth_contract.get('contractId')
-            print(f"[OK] ETH合约找到:")
-            print(f"   合约ID: {eth_contract_id}")
-            print(f"   合约名称: {eth_contract.get('contractName')}")
-            print(f"   最小订单量: {eth_contract.get('minOrderSize')}")
-            print(f"   价格精度: {eth_contract.get('tickSize')}")
-        else:
-            print("[ERROR] ETH合约未找到")
-            return False
-        
-        if sol_contract:
-            sol_contract_id = sol_contract.get('contractId')
-            print(f"\n[OK] SOL合约找到:")
-            print(f"   合约ID: {sol_contract_id}")
-            print(f"   合约名称: {sol_contract.get('contractName')}")
-            print(f"   最小订单量: {sol_contract.get('minOrderSize')}")
-            print(f"   价格精度: {sol_contract.get('tickSize')}")
-        else:
-            print("\n[ERROR] SOL合约未找到")
-            return False
-        
-        # 测试REST API获取实时价格
-        print("\n" + "=" * 60)
-        print("REST API 实时价格测试")
-        print("=" * 60)
-        
-        from edgex_sdk import GetOrderBookDepthParams
-        
-        # 获取ETH价格
-        print("\n[PRICE] ETH 实时价格:")
-        try:
-            eth_depth_params = GetOrderBookDepthParams(contract_id=eth_contract_id, limit=15)
-            eth_order_book = await client.quote.get_order_book_depth(eth_depth_params)
-            eth_data = eth_order_book['data'][0]
-            eth_bids = eth_data.get('bids', [])
-            eth_asks = eth_data.get('asks', [])
+        # REST请求在同一个HTTP会话中完成（keep-alive复用连接），结束后自动关闭会话
+        async with client:
+            # 获取合约列表
+            print("[FETCH] 正在获取合约列表...")
+            response = await client.get_metadata()
+            data = response.get('data', {})
+            contract_list = data.get('contractList', [])
+            
+            if not contract_list:
+                print("[ERROR] 无法获取合约列表")
+                return False
+            
+            # 查找ETH和SOL的合约ID
+            by_name = {c.get('contractName'): c for c in contract_list if c.get('contractName')}
+            eth_contract = by_name.get('ETHUSD')
+            sol_contract = by_name.get('SOLUSD')
+            
+            print("\n" + "=" * 60)
+            print("合约信息")
+            print("=" * 60)
             
-            if eth_bids and eth_asks:
-                best_bid = Decimal(eth_bids[0]['price'])
-                best_ask = Decimal(eth_asks[0]['price'])
-                spread = best_ask - best_bid
-                mid_price = (best_bid + best_ask) / 2
-                print(f"   最佳买价: {best_bid}")
-                print(f"   最佳卖价: {best_ask}")
-                print(f"   中间价: {mid_price}")
-                print(f"   价差: {spread} ({spread/mid_price*100:.4f}%)")
+            if eth_contract:
+                eth_contract_id = eth_contract.get('contractId')
+                print(f"[OK] ETH合约找到:")
+                print(f"   合约ID: {eth_contract_id}")
+                print(f"   合约名称: {eth_contract.get('contractName')}")
+                print(f"   最小订单量: {eth_contract.get('minOrderSize')}")
+                print(f"   价格精度: {eth_contract.get('tickSize')}")
             else:
-                print("   [WARNING] 无法获取ETH订单簿数据")
-        except Exception as e:
-            print(f"   [ERROR] 获取ETH价格失败: {e}")
-        
-        # 获取SOL价格
-        print("\n[PRICE] SOL 实时价格:")
-        try:
-            sol_depth_params = GetOrderBookDepthParams(contract_id=sol_contract_id, limit=15)
-            sol_order_book = await client.quote.get_order_book_depth(sol_depth_params)
-            sol_data = sol_order_book['data'][0]
-            sol_bids = sol_data.get('bids', [])
-            sol_asks = sol_data.get('asks', [])
+                print("[ERROR] ETH合约未找到")
+                return False
             
-            if sol_bids and sol_asks:
-                best_bid = Decimal(sol_bids[0]['price'])
-                best_ask = Decimal(sol_asks[0]['price'])
-                spread = best_ask - best_bid
-                mid_price = (best_bid + best_ask) / 2
-                print(f"   最佳买价: {best_bid}")
-                print(f"   最佳卖价: {best_ask}")
-                print(f"   中间价: {mid_price}")
-                print(f"   价差: {spread} ({spread/mid_price*100:.4f}%)")
+            if sol_contract:
+                sol_contract_id = sol_contract.get('contractId')
+                print(f"\n[OK] SOL合约找到:")
+                print(f"   合约ID: {sol_contract_id}")
+                print(f"   合约名称: {sol_contract.get('contractName')}")
+                print(f"   最小订单量: {sol_contract.get('minOrderSize')}")
+                print(f"   价格精度: {sol_contract.get('tickSize')}")
             else:
-                print("   [WARNING] 无法获取SOL订单簿数据")
-        except Exception as e:
-            print(f"   [ERROR] 获取SOL价格失败: {e}")
-        
+                print("\n[ERROR] SOL合约未找到")
+                return False
+            
+            # 测试REST API获取实时价格
+            print("\n" + "=" * 60)
+            print("REST API 实时价格测试")
+            print("=" * 60)
+            
+            from edgex_sdk import GetOrderBookDepthParams
+            
+            # 同时请求ETH和SOL订单簿，两个请求并发进行
+            eth_depth_params = GetOrderBookDepthParams(contract_id=eth_contract_id, limit=15)
+            sol_depth_params = GetOrderBookDepthParams(contract_id=sol_contract_id, limit=15)
+            eth_order_book, sol_order_book = await asyncio.gather(
+                client.quote.get_order_book_depth(eth_depth_params),
+                client.quote.get_order_book_depth(sol_depth_params),
+                return_exceptions=True
+            )
+            
+            for symbol, order_book in (('ETH', eth_order_book), ('SOL', sol_order_book)):
+                print(f"\n[PRICE] {symbol} 实时价格:")
+                try:
+                    if isinstance(order_book, Exception):
+                        raise order_book
+                    book_data = order_book['data'][0]
+                    bids = book_data.get('bids', [])
+                    asks = book_data.get('asks', [])
+                    
+                    if bids and asks:
+                        # 价格只用于显示和百分比计算，每个价格解析一次为float
+                        best_bid = float(bids[0]['price'])
+                        best_ask = float(asks[0]['price'])
+                        spread = best_ask - best_bid
+                        mid_price = (best_bid + best_ask) * 0.5
+                        print(f"   最佳买价: {best_bid}")
+                        print(f"   最佳卖价: {best_ask}")
+                        print(f"   中间价: {mid_price}")
+                        print(f"   价差: {spread:g} ({spread/mid_price*100:.4f}%)")
+                    else:
+                        print(f"   [WARNING] 无法获取{symbol}订单簿数据")
+                except Exception as e:
+                    print(f"   [ERROR] 获取{symbol}价格失败: {e}")
+            
         # 测试WebSocket实时数据
         print("\n" + "=" * 60)
         print("WebSocket 实时数据测试")
@@ -171,12 +182,13 @@ async def test_edgex_realtime_data():
         # 初始化WebSocket管理器
         ws_manager = WebSocketManager(
             base_url=ws_url,
-            account_id=int(account_id),
+            account_id=account_id_int,
             stark_pri_key=stark_private_key
         )
         
         # 存储接收到的数据
-        import time
+        # 耗时统计使用单调时钟（不受系统时间调整影响），绑定为局部名称减少属性查找
+        from time import monotonic as _now
         eth_data_received = False
         sol_data_received = False
         message_count = 0
@@ -188,78 +200,134 @@ async def test_edgex_realtime_data():
         eth_update_count = 0
         sol_update_count = 0
         
+        # 两个品种都收到数据后通过事件唤醒主协程
+        loop = asyncio.get_running_loop()
+        both_ready = asyncio.Event()
+        
+        # 消息处理中的输出先放入缓冲区，由后台任务合并后一次写入stdout
+        log_buf = deque()
+        log_evt = asyncio.Event()
+        
+        def _log(line):
+            log_buf.append(line + "\n")
+            log_evt.set()
+        
+        def _flush_log():
+            if log_buf:
+                sys.stdout.write("".join(log_buf))
+                log_buf.clear()
+        
+        async def _log_writer():
+            while True:
+                await log_evt.wait()
+                log_evt.clear()
+                await asyncio.sleep(0.05)  # 合并50ms内的输出
+                _flush_log()
+        
+        def _print_book(symbol, update_count, depth_type, book_get, current_time):
+            """打印最优买卖价"""
+            bids = book_get('bids', [])
+            asks = book_get('asks', [])
+            
+            if bids and asks:
+                # 仅用于显示，用float即可
+                best_bid = float(bids[0]['price'])
+                best_ask = float(asks[0]['price'])
+                elapsed = current_time - start_time if start_time else 0
+                # 四行合并为一个字符串，只入队一次
+                _log(f"\n[WS] {symbol} WebSocket数据 ({depth_type}) [第{update_count}次更新, 运行{elapsed:.1f}秒]:\n"
+                     f"   最佳买价: {best_bid}\n"
+                     f"   最佳卖价: {best_ask}\n"
+                     f"   价差: {best_ask - best_bid:g}")
+        
+        def _on_eth(book_get, depth_type, current_time):
+            nonlocal eth_data_received, first_eth_time, last_eth_time, eth_update_count
+            if not eth_data_received:
+                first_eth_time = current_time
+            eth_data_received = True
+            last_eth_time = current_time
+            eth_update_count += 1
+            _print_book('ETH', eth_update_count, depth_type, book_get, current_time)
+        
+        def _on_sol(book_get, depth_type, current_time):
+            nonlocal sol_data_received, first_sol_time, last_sol_time, sol_update_count
+            if not sol_data_received:
+                first_sol_time = current_time
+            sol_data_received = True
+            last_sol_time = current_time
+            sol_update_count += 1
+            _print_book('SOL', sol_update_count, depth_type, book_get, current_time)
+        
+        # 合约ID字符串预先计算好，按合约ID直接分派到对应处理函数
+        depth_handlers = {str(eth_contract_id): _on_eth, str(sol_contract_id): _on_sol}
+        
+        ws_error_count = 0
+        
         def handle_depth_message(message):
             """处理深度数据消息（带时间记录）"""
-            nonlocal eth_data_received, sol_data_received, message_count
-            nonlocal first_eth_time, first_sol_time, last_eth_time, last_sol_time
-            nonlocal eth_update_count, sol_update_count
+            nonlocal message_count, ws_error_count
             try:
-                if isinstance(message, str):
-                    message = json.loads(message)
+                if isinstance(message, (str, bytes, bytearray)):
+                    message = _json_loads(message)
                 
                 message_count += 1
-                current_time = time.time()
+                current_time = _now()
                 
-                # 打印所有消息以便调试
-                if message_count <= 3:
-                    print(f"   [DEBUG] 收到消息 #{message_count}: {str(message)[:200]}")
+                # 打印前3条消息以便调试（python -O 运行时整段被移除）
+                if __debug__ and message_count <= 3:
+                    _log(f"   [DEBUG] 收到消息 #{message_count}: {_debug_repr.repr(message)[:200]}")
                 
                 msg_type = message.get("type", "") if isinstance(message, dict) else ""
                 channel = message.get("channel", "") if isinstance(message, dict) else ""
                 
                 # 处理depth消息
-                if msg_type == "quote-event" and channel.startswith("depth."):
+                if msg_type == _QUOTE_EVENT and channel.startswith(_DEPTH_PREFIX):
                     content = message.get("content", {})
                     data = content.get('data', [])
                     
-                    if data and len(data) > 0:
-                        order_book_data = data[0]
-                        contract_id = str(order_book_data.get('contractId', ''))
-                        depth_type = order_book_data.get('depthType', '')
-                        
-                        if contract_id == str(eth_contract_id):
-                            if not eth_data_received:
-                                first_eth_time = current_time
-                            eth_data_received = True
-                            last_eth_time = current_time
-                            eth_update_count += 1
-                            bids = order_book_data.get('bids', [])
-                            asks = order_book_data.get('asks', [])
-                            
-                            if bids and asks:
-                                best_bid = Decimal(bids[0]['price'])
-                                best_ask = Decimal(asks[0]['price'])
-                                elapsed = current_time - start_time if start_time else 0
-                                print(f"\n[WS] ETH WebSocket数据 ({depth_type}) [第{eth_update_count}次更新, 运行{elapsed:.1f}秒]:")
-                                print(f"   最佳买价: {best_bid}")
-                                print(f"   最佳卖价: {best_ask}")
-                                print(f"   价差: {best_ask - best_bid}")
+                    if data:
+                        book_get = data[0].get
+                        handler = depth_handlers.get(str(book_get('contractId', '')))
+                        if handler is not None:
+                            handler(book_get, book_get('depthType', ''), current_time)
                         
-                        elif contract_id == str(sol_contract_id):
-                            if not sol_data_received:
-                                first_sol_time = current_time
-                            sol_data_received = True
-                            last_sol_time = current_time
-                            sol_update_count += 1
-                            bids = order_book_data.get('bids', [])
-                            asks = order_book_data.get('asks', [])
-                            
-                            if bids and asks:
-                                best_bid = Decimal(bids[0]['price'])
-                                best_ask = Decimal(asks[0]['price'])
-                                elapsed = current_time - start_time if start_time else 0
-                                print(f"\n[WS] SOL WebSocket数据 ({depth_type}) [第{sol_update_count}次更新, 运行{elapsed:.1f}秒]:")
-                                print(f"   最佳买价: {best_bid}")
-                                print(f"   最佳卖价: {best_ask}")
-                                print(f"   价差: {best_ask - best_bid}")
+                        if eth_data_received and sol_data_received and not both_ready.is_set():
+                            both_ready.set()
                 elif msg_type or (isinstance(message, dict) and message):
                     if message_count <= 5:
-                        print(f"   [DEBUG] 其他消息: type={msg_type}, channel={channel}")
+                        _log(f"   [DEBUG] 其他消息: type={msg_type}, channel={channel}")
                 
             except Exception as e:
-                print(f"   [WARNING] 处理WebSocket消息错误: {e}")
-                import traceback
-                traceback.print_exc()
+                # 只打印前3次错误的堆栈，避免连续的错误消息阻塞WebSocket接收线程
+                ws_error_count += 1
+                if ws_error_count <= 3:
+                    print(f"   [WARNING] 处理WebSocket消息错误: {e}")
+                    import traceback
+                    traceback.print_exc()
+                elif ws_error_count == 4:
+                    print("   [WARNING] 后续WebSocket消息错误将不再输出")
+        
+        # SDK的消息回调运行在WebSocket接收线程中：回调只把原始消息放入有界队列，
+        # 解析和打印由事件循环中的消费任务完成，队列满时丢弃并计数
+        ws_queue = asyncio.Queue(maxsize=1024)
+        dropped_messages = 0
+        
+        def _enqueue(message):
+            nonlocal dropped_messages
+            try:
+                ws_queue.put_nowait(message)
+            except asyncio.QueueFull:
+                dropped_messages += 1
+        
+        def on_ws_message(message):
+            loop.call_soon_threadsafe(_enqueue, message)
+        
+        async def _drain():
+            while True:
+                handle_depth_message(await ws_queue.get())
+        
+        consumer = asyncio.create_task(_drain())
+        log_writer = asyncio.create_task(_log_writer())
         
         # 连接WebSocket并订阅
         print("\n[CONNECT] 正在连接WebSocket...")
@@ -269,34 +337,33 @@ async def test_edgex_realtime_data():
             
             # 获取公共客户端并设置消息处理器
             public_client = ws_manager.get_public_client()
-            public_client.on_message("depth", handle_depth_message)
+            public_client.on_message("depth", on_ws_message)
             
-            # 订阅ETH和SOL的深度数据
-            print(f"\n[SUBSCRIBE] 正在订阅ETH深度数据 (depth.{eth_contract_id}.15)...")
-            public_client.subscribe(f"depth.{eth_contract_id}.15")
-            
-            print(f"[SUBSCRIBE] 正在订阅SOL深度数据 (depth.{sol_contract_id}.15)...")
-            public_client.subscribe(f"depth.{sol_contract_id}.15")
+            # 订阅ETH和SOL的深度数据（EdgeX行情WS每条订阅消息只接受一个channel，连续发送）
+            depth_channels = [f"{_DEPTH_PREFIX}{eth_contract_id}.15", f"{_DEPTH_PREFIX}{sol_contract_id}.15"]
+            print(f"\n[SUBSCRIBE] 正在订阅ETH/SOL深度数据 ({', '.join(depth_channels)})...")
+            for channel in depth_channels:
+                public_client.subscribe(channel)
             
             print("\n[WAIT] 等待WebSocket数据 (15秒)...")
             print("   提示: WebSocket可以持续接收数据，只要连接保持，理论上可以无限期接收实时更新")
             
             # 开始计时
-            start_time = time.time()
-            
-            # 等待数据 - 给WebSocket更多时间建立连接和接收数据
-            await asyncio.sleep(2)  # 先等待2秒让连接稳定
+            start_time = _now()
             
-            for i in range(26):  # 再等待最多13秒
-                await asyncio.sleep(0.5)
-                if eth_data_received and sol_data_received:
+            # 等待数据 - 两个品种都收到数据后立即结束等待，最多等待15秒
+            for _ in range(3):
+                try:
+                    await asyncio.wait_for(both_ready.wait(), timeout=5)
                     break
-                # 每5秒打印一次状态
-                if i > 0 and i % 10 == 0:
-                    elapsed = time.time() - start_time
+                except asyncio.TimeoutError:
+                    # 每5秒打印一次状态
+                    _flush_log()
+                    elapsed = _now() - start_time
                     print(f"   [WAIT] 已等待 {elapsed:.1f} 秒...")
             
-            total_time = time.time() - start_time
+            total_time = _now() - start_time
+            _flush_log()
             
             print("\n" + "=" * 60)
             print("测试结果")
@@ -321,6 +388,8 @@ async def test_edgex_realtime_data():
                 print("[ERROR] SOL WebSocket数据未接收")
             
             print(f"\n[INFO] 总共接收到 {message_count} 条WebSocket消息")
+            if dropped_messages:
+                print(f"[WARNING] 处理队列已满，丢弃了 {dropped_messages} 条消息")
             print(f"[INFO] 总运行时间: {total_time:.1f}秒")
             
             print("\n" + "=" * 60)
@@ -342,17 +411,20 @@ async def test_edgex_realtime_data():
             print("      - 持续运行WebSocket并本地存储数据")
             print("      - 使用其他提供历史数据API的交易所")
             
-            # 断开连接
-            ws_manager.disconnect_public()
-            print("\n[DISCONNECT] WebSocket已断开")
-            
         except Exception as e:
             print(f"[ERROR] WebSocket连接失败: {e}")
             import traceback
             traceback.print_exc()
-        
-        # 关闭客户端
-        await client.close()
+        finally:
+            # 无论成功与否都先断开连接，停止SDK的WebSocket线程再向即将关闭的事件循环投递消息
+            try:
+                ws_manager.disconnect_public()
+                print("\n[DISCONNECT] WebSocket已断开")
+            except Exception as e:
+                print(f"[WARNING] 断开WebSocket时出错: {e}")
+            consumer.cancel()
+            log_writer.cancel()
+            _flush_log()
         
         print("\n" + "=" * 60)
         print("测试完成")
@@ -367,7 +439,7 @@ async def test_edgex_realtime_data():
         return False
 
 if __name__ == "__main__":
-    result = asyncio.run(test_edgex_realtime_data())
+    result = run(test_edgex_realtime_data)
     if result:
         print("\n[SUCCESS] 测试通过: 可以通过环境变量获取ETH和SOL在EdgeX的实时数据")
     else:
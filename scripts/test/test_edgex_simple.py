@@ -3,15 +3,14 @@
 """简单测试EdgeX数据获取"""
 
 import sys
-import asyncio
 from pathlib import Path
 from decimal import Decimal
-import dotenv
+from _env import load_env, run
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-dotenv.load_dotenv(project_root / ".env")
+load_env()
 
 from exchanges import ExchangeFactory
 
@@ -34,24 +33,9 @@ async def test_edgex():
     }
     
     try:
-        # 创建客户端（需要先创建对象，然后替换）
+        # 创建客户端（直接传入属性访问式的配置对象，无需修改BaseExchangeClient）
         print("1. 创建客户端...")
-        # 临时修改BaseExchangeClient来接受对象
-        from exchanges.base import BaseExchangeClient
-        original_init = BaseExchangeClient.__init__
-        
-        def patched_init(self, config):
-            if isinstance(config, dict):
-                self.config = SimpleConfig(**config)
-            else:
-                self.config = config
-            self._validate_config()
-        
-        BaseExchangeClient.__init__ = patched_init
-        try:
-            client = ExchangeFactory.create_exchange('edgex', config_dict)
-        finally:
-            BaseExchangeClient.__init__ = original_init
+        client = ExchangeFactory.create_exchange('edgex', SimpleConfig(**config_dict))
         print("   [OK]")
         
         # 连接
@@ -91,5 +75,5 @@ async def test_edgex():
 
 
 if __name__ == "__main__":
-    success = asyncio.run(test_edgex())
+    success = run(test_edgex)
     sys.exit(0 if success else 1)
@@ -2,15 +2,23 @@
 回测脚本：使用历史数据计算策略收益
 """
 
-import os
 import sys
 import json
 import time
 from pathlib import Path
-from decimal import Decimal
 from datetime import datetime
-from collections import deque
-import dotenv
+from array import array
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor
+from _env import load_env
+from _cache import cache_path, cache_key, load_columns, save_columns
+
+# 优先使用orjson解析大文件（更快），未安装时回退到标准库json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # 设置输出编码为UTF-8
 if sys.platform == 'win32':
@@ -20,158 +28,206 @@ if sys.platform == 'win32':
 
 # 加载.env文件
 project_root = Path(__file__).parent
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
+load_env()
 
 
 class SimpleOrderFlowStrategy:
     """简化的订单流策略，用于回测"""
     
-    def __init__(self, tick_size, position_size=Decimal('0.1'), imbalance_threshold=0.3):
+    # 每个tick都会读写实例属性，使用__slots__避免__dict__查找
+    __slots__ = (
+        'tick_size', 'position_size', 'imbalance_threshold',
+        'imbalance', '_imbalance_valid', 'best_bid', 'best_ask',
+        'price_history', '_head', '_count',
+    )
+    
+    def __init__(self, tick_size, position_size=0.1, imbalance_threshold=0.3):
         self.tick_size = tick_size
         self.position_size = position_size
         self.imbalance_threshold = imbalance_threshold
         
-        # 订单簿数据（模拟）
-        self.bid_volume = Decimal(0)
-        self.ask_volume = Decimal(0)
-        self.best_bid = Decimal(0)
-        self.best_ask = Decimal(0)
+        # 订单簿数据（模拟），全部使用float，避免每个tick构造Decimal
+        self.imbalance = 0.0
+        self._imbalance_valid = True  # imbalance是否对应最新一次市场数据
+        self.best_bid = 0.0
+        self.best_ask = 0.0
         
-        # 价格历史（用于计算失衡）
-        self.price_history = deque(maxlen=10)
+        # 价格历史（用于计算失衡）：固定长度的环形缓冲区，_head为下一个写入位置
+        self.price_history = array('d', [0.0]) * 10
+        self._head = 0
+        self._count = 0
         
     def update_market_data(self, best_bid, best_ask, mid_price):
         """更新市场数据"""
-        self.best_bid = Decimal(str(best_bid))
-        self.best_ask = Decimal(str(best_ask))
-        self.price_history.append(Decimal(str(mid_price)))
+        self.update_and_signal(best_bid, best_ask, mid_price, check_signal=False)
+        self.calculate_imbalance()
+    
+    def update_and_signal(self, best_bid, best_ask, mid_price, check_signal=True):
+        """更新市场数据并按需生成交易信号（回测主循环每个tick只需调用这一个方法）
+        
+        失衡只在需要检查信号时计算；未计算时标记为过期，calculate_imbalance()会按最新数据补算
+        """
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+        hist = self.price_history
+        head = self._head
+        hist[head] = mid_price
+        self._head = (head + 1) % 10
+        if self._count < 10:
+            self._count += 1
         
+        if not check_signal or best_bid <= 0 or best_ask <= 0:
+            self._imbalance_valid = False
+            return None
+        
+        imbalance = self.imbalance = self._simulated_imbalance(best_bid, best_ask, mid_price)
+        self._imbalance_valid = True
+        
+        return self._build_signal(imbalance, best_bid, best_ask)
+    
+    def _build_signal(self, imbalance, best_bid, best_ask):
+        """失衡超过阈值时生成信号字典，否则返回None"""
+        threshold = self.imbalance_threshold
+        if abs(imbalance) > threshold:
+            direction = 'buy' if imbalance > 0 else 'sell'
+            return {
+                'direction': direction,
+                'strength': min(abs(imbalance) / threshold, 1.0),
+                'imbalance': imbalance,
+                'price': best_ask if direction == 'buy' else best_bid
+            }
+        
+        return None
+    
+    def _simulated_imbalance(self, best_bid, best_ask, mid_price):
+        """根据最新价格和价差模拟订单簿失衡
+        
+        模拟的买卖量为 1000*(1+f) 对 1000（或 1200 对 800），
+        失衡 (买量-卖量)/(买量+卖量) 直接按化简后的公式计算：±f/(2+f) 或 0.2
+        """
         # 模拟订单簿失衡（基于价格变化趋势和价差）
-        spread = self.best_ask - self.best_bid
-        spread_pct = float(spread / self.best_bid) if self.best_bid > 0 else 0
+        spread = best_ask - best_bid
+        spread_pct = spread / best_bid if best_bid > 0 else 0
         
-        if len(self.price_history) >= 3:
-            recent_prices = list(self.price_history)[-3:]
-            price_trend = float((recent_prices[-1] - recent_prices[0]) / recent_prices[0])
+        if self._count >= 3:
+            # 最新价与往前第2个价格比较（_head已指向下一个写入位置，负下标自动回绕）
+            base_price = self.price_history[self._head - 3]
+            price_trend = (mid_price - base_price) / base_price
             
             # 基于价格趋势和价差计算失衡
             # 如果价格上涨且价差较小，买盘更强
-            if price_trend > 0.00005:  # 0.005%以上
-                imbalance_factor = abs(price_trend) * 20 + (0.01 - min(spread_pct, 0.01)) * 5
-                self.bid_volume = Decimal('1000') * Decimal(str(1 + imbalance_factor))
-                self.ask_volume = Decimal('1000')
-            elif price_trend < -0.00005:  # 下跌
+            if abs(price_trend) > 0.00005:  # 0.005%以上
                 imbalance_factor = abs(price_trend) * 20 + (0.01 - min(spread_pct, 0.01)) * 5
-                self.ask_volume = Decimal('1000') * Decimal(str(1 + imbalance_factor))
-                self.bid_volume = Decimal('1000')
-            else:
-                # 基于价差判断
-                if spread_pct < 0.005:  # 价差很小，可能失衡
-                    self.bid_volume = Decimal('1200')
-                    self.ask_volume = Decimal('800')
-                else:
-                    self.bid_volume = Decimal('1000')
-                    self.ask_volume = Decimal('1000')
-        else:
-            # 基于价差判断
-            if spread_pct < 0.005:
-                self.bid_volume = Decimal('1200')
-                self.ask_volume = Decimal('800')
-            else:
-                self.bid_volume = Decimal('1000')
-                self.ask_volume = Decimal('1000')
+                imbalance = imbalance_factor / (2.0 + imbalance_factor)
+                return imbalance if price_trend > 0 else -imbalance  # 上涨买盘强，下跌卖盘强
+        
+        # 基于价差判断：价差很小，可能失衡
+        if spread_pct < 0.005:
+            return 0.2
+        return 0.0
     
     def calculate_imbalance(self):
         """计算订单簿失衡"""
-        total_volume = self.bid_volume + self.ask_volume
-        if total_volume == 0:
-            return 0.0
-        
-        imbalance = float((self.bid_volume - self.ask_volume) / total_volume)
-        return imbalance
+        if not self._imbalance_valid:
+            # 最新中间价位于_head前一个位置
+            self.imbalance = self._simulated_imbalance(
+                self.best_bid, self.best_ask, self.price_history[self._head - 1]
+            )
+            self._imbalance_valid = True
+        return self.imbalance
     
     def generate_signal(self):
         """生成交易信号"""
-        if self.best_bid <= 0 or self.best_ask <= 0:
+        best_bid = self.best_bid
+        best_ask = self.best_ask
+        if best_bid <= 0 or best_ask <= 0:
             return None
         
-        imbalance = self.calculate_imbalance()
-        
-        # 如果失衡超过阈值，生成信号
-        if abs(imbalance) > self.imbalance_threshold:
-            direction = 'buy' if imbalance > 0 else 'sell'
-            strength = min(abs(imbalance) / self.imbalance_threshold, 1.0)
-            
-            return {
-                'direction': direction,
-                'strength': strength,
-                'imbalance': imbalance,
-                'price': float(self.best_ask if direction == 'buy' else self.best_bid)
-            }
-        
-        return None
+        return self._build_signal(self.calculate_imbalance(), best_bid, best_ask)
 
 
 class BacktestEngine:
     """回测引擎"""
     
-    def __init__(self, strategy, initial_capital=Decimal('10000'), fee_rate=Decimal('0.0005')):
+    __slots__ = (
+        'strategy', 'initial_capital', 'fee_rate',
+        'cash', 'position', 'avg_entry_price',
+        'trades', 'equity_timestamps', 'equity_values', 'equity_cash',
+        'equity_positions', 'equity_position_values',
+        'total_trades', 'winning_trades', 'losing_trades', 'total_profit',
+        'max_drawdown', 'peak_equity',
+    )
+    
+    def __init__(self, strategy, initial_capital=10000.0, fee_rate=0.0005):
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.fee_rate = fee_rate  # 0.05% 手续费
         
         # 账户状态
         self.cash = initial_capital
-        self.position = Decimal(0)  # 持仓数量
-        self.avg_entry_price = Decimal(0)  # 平均入场价格
+        self.position = 0.0  # 持仓数量
+        self.avg_entry_price = 0.0  # 平均入场价格
         
         # 交易记录
         self.trades = []
-        self.equity_curve = []
+        
+        # 权益曲线按列存储在float数组中，每个tick追加一个值而不是构造一个dict
+        self.equity_timestamps = array('d')
+        self.equity_values = array('d')
+        self.equity_cash = array('d')
+        self.equity_positions = array('d')
+        self.equity_position_values = array('d')
         
         # 统计
         self.total_trades = 0
         self.winning_trades = 0
         self.losing_trades = 0
-        self.total_profit = Decimal(0)
-        self.max_drawdown = Decimal(0)
+        self.total_profit = 0.0
+        self.max_drawdown = 0.0
         self.peak_equity = initial_capital
         
     def execute_trade(self, signal, current_price, timestamp):
-        """执行交易"""
+        """执行交易
+        
+        账户状态先读入局部变量，计算完成后一次性写回
+        """
         direction = signal['direction']
-        price = Decimal(str(signal['price']))
+        price = signal['price']
         size = self.strategy.position_size
+        cash = self.cash
+        position = self.position
         
         # 计算手续费
-        fee = price * size * self.fee_rate
+        notional = price * size
+        fee = notional * self.fee_rate
         
         if direction == 'buy':
             # 买入
-            cost = price * size + fee
+            cost = notional + fee
             
-            if cost <= self.cash:
-                self.cash -= cost
+            if cost <= cash:
+                cash -= cost
                 
                 # 更新平均入场价格
-                if self.position == 0:
+                if position == 0:
                     self.avg_entry_price = price
                 else:
-                    total_cost = self.avg_entry_price * self.position + cost
-                    self.avg_entry_price = total_cost / (self.position + size)
+                    total_cost = self.avg_entry_price * position + cost
+                    self.avg_entry_price = total_cost / (position + size)
                 
-                self.position += size
+                # float累加0.1会产生误差，取整后持仓才能准确归零
+                position = round(position + size, 10)
+                self.cash = cash
+                self.position = position
                 
                 trade = {
                     'timestamp': timestamp,
                     'type': 'BUY',
-                    'price': float(price),
-                    'size': float(size),
-                    'fee': float(fee),
-                    'position_after': float(self.position),
-                    'cash_after': float(self.cash)
+                    'price': price,
+                    'size': size,
+                    'fee': fee,
+                    'position_after': position,
+                    'cash_after': cash
                 }
                 self.trades.append(trade)
                 self.total_trades += 1
@@ -179,9 +235,8 @@ class BacktestEngine:
         
         else:  # sell
             # 卖出
-            if self.position >= size:
-                revenue = price * size - fee
-                self.cash += revenue
+            if position >= size:
+                cash += notional - fee
                 
                 # 计算盈亏
                 pnl = (price - self.avg_entry_price) * size - fee
@@ -192,20 +247,22 @@ class BacktestEngine:
                 else:
                     self.losing_trades += 1
                 
-                self.position -= size
+                position = round(position - size, 10)
+                self.cash = cash
+                self.position = position
                 
-                if self.position == 0:
-                    self.avg_entry_price = Decimal(0)
+                if position == 0:
+                    self.avg_entry_price = 0.0
                 
                 trade = {
                     'timestamp': timestamp,
                     'type': 'SELL',
-                    'price': float(price),
-                    'size': float(size),
-                    'fee': float(fee),
-                    'pnl': float(pnl),
-                    'position_after': float(self.position),
-                    'cash_after': float(self.cash)
+                    'price': price,
+                    'size': size,
+                    'fee': fee,
+                    'pnl': pnl,
+                    'position_after': position,
+                    'cash_after': cash
                 }
                 self.trades.append(trade)
                 self.total_trades += 1
@@ -215,27 +272,33 @@ class BacktestEngine:
     
     def calculate_equity(self, current_price):
         """计算当前权益"""
-        position_value = Decimal(str(current_price)) * self.position
+        position_value = current_price * self.position
         return self.cash + position_value
     
     def update_equity_curve(self, current_price, timestamp):
         """更新权益曲线"""
-        equity = self.calculate_equity(current_price)
-        self.equity_curve.append({
-            'timestamp': timestamp,
-            'equity': float(equity),
-            'cash': float(self.cash),
-            'position': float(self.position),
-            'position_value': float(Decimal(str(current_price)) * self.position)
-        })
-        
-        # 更新最大回撤
-        if equity > self.peak_equity:
-            self.peak_equity = equity
-        
-        drawdown = (self.peak_equity - equity) / self.peak_equity
-        if drawdown > self.max_drawdown:
-            self.max_drawdown = drawdown
+        # 持仓市值只算一次，同时用于权益和记录
+        cash = self.cash
+        position = self.position
+        position_value = current_price * position
+        equity = cash + position_value
+        self.equity_timestamps.append(timestamp)
+        self.equity_values.append(equity)
+        self.equity_cash.append(cash)
+        self.equity_positions.append(position)
+        self.equity_position_values.append(position_value)
+    
+    def calculate_max_drawdown(self):
+        """根据完整的权益曲线一次性计算最大回撤（峰值从初始资金开始）"""
+        equity_values = self.equity_values
+        # accumulate(max)得到逐点的历史峰值；第一个元素是initial本身，跳过
+        peaks = accumulate(equity_values, max, initial=self.initial_capital)
+        next(peaks)
+        self.max_drawdown = max(((peak - equity) / peak for peak, equity in zip(peaks, equity_values)),
+                                default=0.0)
+        if equity_values:
+            self.peak_equity = max(self.initial_capital, max(equity_values))
+        return self.max_drawdown
     
     def get_statistics(self, final_price):
         """获取回测统计"""
@@ -243,6 +306,7 @@ class BacktestEngine:
         total_return = (final_equity - self.initial_capital) / self.initial_capital * 100
         
         win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
+        max_drawdown = self.calculate_max_drawdown()
         
         return {
             'initial_capital': float(self.initial_capital),
@@ -253,40 +317,95 @@ class BacktestEngine:
             'winning_trades': self.winning_trades,
             'losing_trades': self.losing_trades,
             'win_rate_pct': float(win_rate),
-            'max_drawdown_pct': float(self.max_drawdown * 100),
+            'max_drawdown_pct': float(max_drawdown * 100),
             'final_position': float(self.position),
             'final_cash': float(self.cash)
         }
 
 
+def _empty_columns():
+    """(unix_time, best_bid, best_ask, mid_price) 四个空的float列"""
+    return array('d'), array('d'), array('d'), array('d')
+
+
+def _read_data_file(file_path):
+    """读取并解析单个数据文件，只保留报价有效的ETH数据
+    
+    直接拆成四个float列返回 (columns, error)，可在子进程中执行
+    """
+    columns = _empty_columns()
+    try:
+        records = _json_loads(file_path.read_bytes())
+    except Exception as e:
+        return columns, str(e)
+    if not isinstance(records, list):
+        return columns, None
+    
+    # 解析后立即过滤并拆列，不保留整份dict列表；无效报价在这里一次性剔除，回测循环中不再判断
+    ts, bid, ask, mid = columns
+    for r in records:
+        if r.get('contract_name') != 'ETHUSD':
+            continue
+        best_bid = r.get('best_bid', 0)
+        best_ask = r.get('best_ask', 0)
+        mid_price = r.get('mid_price', 0)
+        if best_bid > 0 and best_ask > 0 and mid_price > 0:
+            ts.append(r.get('unix_time', 0))
+            bid.append(best_bid)
+            ask.append(best_ask)
+            mid.append(mid_price)
+    return columns, None
+
+
+# 解析后的列缓存文件名（位于数据目录的缓存子目录下）
+CACHE_FILE_NAME = "backtest_columns.bin"
+
+
 def load_historical_data(data_dir):
-    """加载历史数据文件"""
+    """加载历史数据文件
+    
+    返回按时间排序的ETH数据列 (unix_time, best_bid, best_ask, mid_price)，每列为array('d')
+    """
     data_dir = Path(data_dir)
     if not data_dir.exists():
-        return []
-    
-    all_records = []
+        return _empty_columns()
     
     # 读取所有非final文件
-    for file_path in sorted(data_dir.glob("edgex_continuous_*.json")):
-        if "final" in file_path.name:
-            continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                records = json.load(f)
-                if isinstance(records, list):
-                    all_records.extend(records)
-        except Exception as e:
-            print(f"[WARNING] 读取文件失败 {file_path.name}: {e}")
+    file_paths = [p for p in sorted(data_dir.glob("edgex_continuous_*.json")) if "final" not in p.name]
+    
+    # 源文件没有变化时直接使用上次解析、排序好的结果
+    columns_cache = cache_path(data_dir, CACHE_FILE_NAME)
+    key = cache_key(file_paths)
+    cached = load_columns(columns_cache, key, 4)
+    if cached is not None:
+        return cached
     
-    # 按时间排序
-    all_records.sort(key=lambda x: x.get('unix_time', 0))
+    # 多个文件时并行解析（orjson解析时不释放GIL，因此用进程池）
+    if len(file_paths) > 1:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_read_data_file, file_paths))
+    else:
+        results = [_read_data_file(p) for p in file_paths]
     
-    # 只保留ETH数据
-    eth_records = [r for r in all_records if r.get('contract_name') == 'ETHUSD']
+    ts, bid, ask, mid = _empty_columns()
+    has_error = False
+    for file_path, (columns, error) in zip(file_paths, results):
+        if error is not None:
+            has_error = True
+            print(f"[WARNING] 读取文件失败 {file_path.name}: {error}")
+        ts.extend(columns[0])
+        bid.extend(columns[1])
+        ask.extend(columns[2])
+        mid.extend(columns[3])
     
-    return eth_records
+    # 按时间排序：对下标做稳定排序（key为C实现的__getitem__，不走lambda），再按同一顺序重排各列
+    order = sorted(range(len(ts)), key=ts.__getitem__)
+    sorted_columns = tuple(array('d', [col[i] for i in order]) for col in (ts, bid, ask, mid))
+    
+    # 有文件读取失败时不写缓存，下次运行会重新尝试
+    if file_paths and not has_error:
+        save_columns(columns_cache, key, sorted_columns)
+    return sorted_columns
 
 
 def run_backtest():
@@ -299,36 +418,38 @@ def run_backtest():
     # 加载历史数据
     data_dir = project_root / "edgex_data"
     print(f"[LOAD] 正在加载历史数据...")
-    historical_records = load_historical_data(data_dir)
+    # 列式存储（每个字段一个连续的float数组），循环中按下标取值
+    ts_col, bid_col, ask_col, mid_col = load_historical_data(data_dir)
+    n_records = len(ts_col)
     
-    if not historical_records:
+    if not n_records:
         print("[ERROR] 未找到历史数据文件")
         return
     
-    print(f"[OK] 已加载 {len(historical_records)} 条历史记录")
-    print(f"   时间范围: {datetime.fromtimestamp(historical_records[0]['unix_time'])} 至 {datetime.fromtimestamp(historical_records[-1]['unix_time'])}")
+    print(f"[OK] 已加载 {n_records} 条历史记录")
+    print(f"   时间范围: {datetime.fromtimestamp(ts_col[0])} 至 {datetime.fromtimestamp(ts_col[-1])}")
     print()
     
     # 初始化策略（降低阈值以产生更多信号）
     strategy = SimpleOrderFlowStrategy(
-        tick_size=Decimal('0.01'),
-        position_size=Decimal('0.1'),
+        tick_size=0.01,
+        position_size=0.1,
         imbalance_threshold=0.15  # 降低阈值以产生更多交易
     )
     
     # 初始化回测引擎
-    initial_capital = Decimal('10000')  # 初始资金 $10,000
+    initial_capital = 10000.0  # 初始资金 $10,000
     backtest = BacktestEngine(
         strategy=strategy,
         initial_capital=initial_capital,
-        fee_rate=Decimal('0.0005')  # 0.05% 手续费
+        fee_rate=0.0005  # 0.05% 手续费
     )
     
     print(f"[INIT] 回测参数:")
-    print(f"   初始资金: ${initial_capital}")
+    print(f"   初始资金: ${initial_capital:,.2f}")
     print(f"   订单大小: {strategy.position_size}")
     print(f"   失衡阈值: {strategy.imbalance_threshold}")
-    print(f"   手续费率: {backtest.fee_rate * 100}%")
+    print(f"   手续费率: {backtest.fee_rate * 100:g}%")
     print()
     
     print("=" * 70)
@@ -339,61 +460,61 @@ def run_backtest():
     signal_check_interval = 5  # 每5秒检查一次信号
     min_trade_interval = 10  # 最小交易间隔10秒
     
-    last_signal_time = 0
-    last_trade_time = 0
+    # 初始值设为负的间隔，第一个tick即可通过检查，循环中不再需要判断是否为首次
+    last_signal_time = -signal_check_interval
+    last_trade_time = -min_trade_interval
     
     # 处理历史数据（采样处理以提高速度）
-    sample_interval = max(1, len(historical_records) // 10000)  # 最多处理10000个点
+    sample_interval = max(1, n_records // 10000)  # 最多处理10000个点
     print(f"[INFO] 采样处理: 每 {sample_interval} 个点处理一次\n")
     
-    processed_count = 0
-    for i in range(0, len(historical_records), sample_interval):
-        record = historical_records[i]
-        timestamp = record.get('unix_time', 0)
-        best_bid = record.get('best_bid', 0)
-        best_ask = record.get('best_ask', 0)
-        mid_price = record.get('mid_price', 0)
-        
-        if best_bid <= 0 or best_ask <= 0 or mid_price <= 0:
-            continue
-        
-        processed_count += 1
-        
-        # 更新策略市场数据
-        strategy.update_market_data(best_bid, best_ask, mid_price)
+    # 交易和进度信息先收集起来，回测结束后一次性输出，循环内不做I/O
+    output_lines = []
+    
+    # 按步长切片一次完成采样，循环直接遍历各列
+    if sample_interval > 1:
+        ticks = zip(ts_col[::sample_interval], bid_col[::sample_interval],
+                    ask_col[::sample_interval], mid_col[::sample_interval])
+    else:
+        ticks = zip(ts_col, bid_col, ask_col, mid_col)
+    
+    # 循环中每个tick都要调用的方法先绑定到局部变量
+    update_and_signal = strategy.update_and_signal
+    update_equity_curve = backtest.update_equity_curve
+    
+    for processed_count, (timestamp, best_bid, best_ask, mid_price) in enumerate(ticks, 1):
+        # 更新策略市场数据，到了检查间隔时同时生成交易信号
+        signal = update_and_signal(best_bid, best_ask, mid_price,
+                                   timestamp - last_signal_time >= signal_check_interval)
         
         # 更新权益曲线
-        backtest.update_equity_curve(mid_price, timestamp)
+        update_equity_curve(mid_price, timestamp)
         
         # 检查交易信号
-        time_since_last_signal = timestamp - last_signal_time if last_signal_time > 0 else float('inf')
-        
-        if time_since_last_signal >= signal_check_interval:
-            signal = strategy.generate_signal()
-            
-            if signal and signal['strength'] >= 0.5:  # 降低信号强度要求
-                time_since_last_trade = timestamp - last_trade_time if last_trade_time > 0 else float('inf')
-                
-                if time_since_last_trade >= min_trade_interval:
-                    # 执行交易
-                    if backtest.execute_trade(signal, mid_price, timestamp):
-                        last_trade_time = timestamp
-                        last_signal_time = timestamp
-                        
-                        equity = backtest.calculate_equity(mid_price)
-                        return_pct = (equity - initial_capital) / initial_capital * 100
-                        print(f"[TRADE #{backtest.total_trades}] {signal['direction'].upper()} @ ${signal['price']:.2f} | "
-                              f"权益: ${equity:.2f} | 收益率: {return_pct:.2f}%")
+        if signal is not None and signal['strength'] >= 0.5:  # 降低信号强度要求
+            if timestamp - last_trade_time >= min_trade_interval:
+                # 执行交易
+                if backtest.execute_trade(signal, mid_price, timestamp):
+                    last_trade_time = timestamp
+                    last_signal_time = timestamp
+                    
+                    equity = backtest.calculate_equity(mid_price)
+                    return_pct = (equity - initial_capital) / initial_capital * 100
+                    output_lines.append(f"[TRADE #{backtest.total_trades}] {signal['direction'].upper()} @ ${signal['price']:.2f} | "
+                                        f"权益: ${equity:.2f} | 收益率: {return_pct:.2f}%")
         
         # 每处理1000个点显示一次进度
         if processed_count % 1000 == 0:
             equity = backtest.calculate_equity(mid_price)
             return_pct = (equity - initial_capital) / initial_capital * 100
-            print(f"[PROGRESS] 已处理 {processed_count}/{len(historical_records)//sample_interval} 个数据点 | "
-                  f"交易数: {backtest.total_trades} | 当前权益: ${equity:.2f} | 收益率: {return_pct:.2f}%")
+            output_lines.append(f"[PROGRESS] 已处理 {processed_count}/{n_records//sample_interval} 个数据点 | "
+                                f"交易数: {backtest.total_trades} | 当前权益: ${equity:.2f} | 收益率: {return_pct:.2f}%")
+    
+    if output_lines:
+        print("\n".join(output_lines))
     
     # 计算最终统计
-    final_price = historical_records[-1].get('mid_price', 0)
+    final_price = mid_col[-1]
     stats = backtest.get_statistics(final_price)
     
     print("\n" + "=" * 70)
@@ -419,7 +540,7 @@ def run_backtest():
     print()
     
     # 计算年化收益率
-    time_span = historical_records[-1]['unix_time'] - historical_records[0]['unix_time']
+    time_span = ts_col[-1] - ts_col[0]
     days = time_span / 86400
     if days > 0:
         annual_return = stats['total_return_pct'] * (365 / days)
@@ -6,12 +6,20 @@ import os
 import sys
 import asyncio
 import json
-import time
 from pathlib import Path
 from decimal import Decimal
 from datetime import datetime
+from array import array
 from edgex_sdk import Client, OrderSide, GetOrderBookDepthParams
-import dotenv
+from _env import ENV_FILE, load_env
+from _cache import cache_path, cache_key, load_columns, save_columns
+
+# 优先使用orjson解析大文件（更快），未安装时回退到标准库json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # 设置输出编码为UTF-8
 if sys.platform == 'win32':
@@ -21,29 +29,67 @@ if sys.platform == 'win32':
 
 # 加载.env文件
 project_root = Path(__file__).parent
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
-    print(f"[INFO] 已加载 .env 文件: {env_file}\n")
+if load_env():
+    print(f"[INFO] 已加载 .env 文件: {ENV_FILE}\n")
 else:
-    print(f"[WARNING] 未找到 .env 文件: {env_file}")
+    print(f"[WARNING] 未找到 .env 文件: {ENV_FILE}")
     print("   将使用系统环境变量\n")
 
 
+def _signal_kernel(bid_sizes, ask_sizes, imbalance_threshold):
+    """
+    根据前5档买卖量计算失衡和信号
+    
+    返回 (方向, 强度, 失衡)：方向为1(买)/-1(卖)/0(无信号)
+    """
+    # 计算买卖盘总量（前5档）；失衡只用于比较阈值，用float即可，Decimal只在下单价格上使用
+    bid_volume = sum(bid_sizes[:5])
+    ask_volume = sum(ask_sizes[:5])
+    
+    total_volume = bid_volume + ask_volume
+    if total_volume == 0:
+        return 0, 0.0, 0.0
+    
+    # 失衡 = (买盘 - 卖盘) / 总量
+    imbalance = (bid_volume - ask_volume) / total_volume
+    
+    # 如果失衡超过阈值，生成信号
+    abs_imbalance = abs(imbalance)
+    if abs_imbalance > imbalance_threshold:
+        direction = 1 if imbalance > 0 else -1
+        strength = min(abs_imbalance / imbalance_threshold, 1.0)
+        return direction, strength, imbalance
+    
+    return 0, 0.0, imbalance
+
+
 class SimpleOrderFlowStrategy:
     """简化的订单流策略，用于测试"""
     
     def __init__(self, contract_id, tick_size, position_size=Decimal('0.1')):
         self.contract_id = contract_id
         self.tick_size = tick_size
+        # 价格换算成整数tick的倍数（tick_size为0.01时为100），1/tick_size不是整数时为None
+        tick_scale = int(1 / tick_size)
+        self.tick_scale = tick_scale if tick_scale * tick_size == 1 else None
+        # 价格字符串的小数位数（与tick_size一致）
+        self.price_decimals = max(0, -tick_size.as_tuple().exponent)
         self.position_size = position_size
+        # 下单数量固定，提前转成字符串
+        self.position_size_str = str(position_size)
         self.orderbook_depth = 15
         
-        # 订单簿数据
-        self.bids = []
-        self.asks = []
+        # 订单簿数据：每一侧的价格和数量各存一个float数组（更新时解析一次）
+        self.bid_prices = array('d')
+        self.bid_sizes = array('d')
+        self.ask_prices = array('d')
+        self.ask_sizes = array('d')
+        # 最优价用于计算下单价格，保留Decimal
         self.best_bid = Decimal(0)
         self.best_ask = Decimal(0)
+        # 前5档数量快照及其计算结果：快照未变化时直接复用，不再重复计算失衡
+        self._top5 = None
+        self._top5_result = None
         
         # 策略参数
         self.imbalance_threshold = 0.3  # 失衡阈值
@@ -51,79 +97,144 @@ class SimpleOrderFlowStrategy:
         
     def update_orderbook(self, bids, asks):
         """更新订单簿数据"""
-        self.bids = bids
-        self.asks = asks
+        self.bid_prices = array('d', [float(b['price']) for b in bids])
+        self.bid_sizes = array('d', [float(b['size']) for b in bids])
+        self.ask_prices = array('d', [float(a['price']) for a in asks])
+        self.ask_sizes = array('d', [float(a['size']) for a in asks])
+        top5 = (self.bid_sizes[:5].tobytes(), self.ask_sizes[:5].tobytes())
+        if top5 != self._top5:
+            self._top5 = top5
+            self._top5_result = None
         if bids and asks:
             self.best_bid = Decimal(bids[0]['price'])
             self.best_ask = Decimal(asks[0]['price'])
     
+    def _grid_ticks(self, price):
+        """价格已在tick网格上（如 best_ask - tick_size）时返回整数tick数，否则返回None
+        
+        float换算只用于已在网格上的价格；不在网格上的价格（尤其恰好在半个tick处）
+        交给Decimal计算，保持原先 round(price / tick_size) 的银行家舍入结果
+        """
+        if self.tick_scale is None:
+            return None
+        scaled = float(price) * self.tick_scale
+        ticks = round(scaled)
+        return ticks if abs(scaled - ticks) < 1e-6 else None
+    
+    def round_to_tick(self, price):
+        """把价格四舍五入到tick_size的整数倍"""
+        ticks = self._grid_ticks(price)
+        if ticks is not None:
+            # 整数tick计算，避免Decimal除法
+            return Decimal(ticks) * self.tick_size
+        return round(price / self.tick_size) * self.tick_size
+    
+    def format_order_price(self, price):
+        """把价格四舍五入到tick_size并格式化为下单用的字符串"""
+        ticks = self._grid_ticks(price)
+        if ticks is not None:
+            # 按整数tick数直接格式化，不构造Decimal
+            return f"{ticks / self.tick_scale:.{self.price_decimals}f}"
+        return str(round(price / self.tick_size) * self.tick_size)
+    
+    def _top5_signal(self):
+        """返回前5档的 (方向, 强度, 失衡)，前5档数量未变化时复用上次结果"""
+        if self._top5_result is None:
+            self._top5_result = _signal_kernel(self.bid_sizes, self.ask_sizes, self.imbalance_threshold)
+        return self._top5_result
+    
     def calculate_imbalance(self):
         """计算订单簿失衡"""
-        if not self.bids or not self.asks:
-            return 0.0
-        
-        # 计算买卖盘总量（前5档）
-        bid_volume = sum(Decimal(b['size']) for b in self.bids[:5])
-        ask_volume = sum(Decimal(a['size']) for a in self.asks[:5])
-        
-        total_volume = bid_volume + ask_volume
-        if total_volume == 0:
+        if not self.bid_sizes or not self.ask_sizes:
             return 0.0
         
-        # 失衡 = (买盘 - 卖盘) / 总量
-        imbalance = float((bid_volume - ask_volume) / total_volume)
-        return imbalance
+        return self._top5_signal()[2]
     
     def generate_signal(self):
-        """生成交易信号"""
-        if not self.bids or not self.asks:
+        """生成交易信号（前5档数量未变化时复用上次的失衡计算结果）"""
+        if not self.bid_sizes or not self.ask_sizes:
             return None
         
-        imbalance = self.calculate_imbalance()
+        direction_code, strength, imbalance = self._top5_signal()
         
-        # 如果失衡超过阈值，生成信号
-        if abs(imbalance) > self.imbalance_threshold:
-            direction = 'buy' if imbalance > 0 else 'sell'
-            strength = min(abs(imbalance) / self.imbalance_threshold, 1.0)
-            
-            return {
-                'direction': direction,
-                'strength': strength,
-                'imbalance': imbalance,
-                'price': self.best_ask if direction == 'buy' else self.best_bid
-            }
-        
-        return None
+        if direction_code == 0:
+            return None
+        
+        direction = 'buy' if direction_code > 0 else 'sell'
+        return {
+            'direction': direction,
+            'strength': strength,
+            'imbalance': imbalance,
+            'price': self.best_ask if direction == 'buy' else self.best_bid
+        }
+
+
+# 排序后的ETH时间列缓存文件名（位于数据目录的缓存子目录下）
+CACHE_FILE_NAME = "eth_times.bin"
 
 
-def load_historical_data(data_dir):
-    """加载历史数据文件"""
+def _load_one(file_path):
+    """读取单个数据文件中ETH记录的时间列，返回 (array('d'), 错误)"""
+    try:
+        with open(file_path, 'rb') as f:
+            records = _json_loads(f.read())
+    except Exception as e:
+        return array('d'), e
+    if not isinstance(records, list):
+        return array('d'), None
+    return array('d', [r.get('unix_time', 0) for r in records if r.get('contract_name') == 'ETHUSD']), None
+
+
+async def load_historical_data(data_dir):
+    """加载历史数据文件
+    
+    测试只用到ETH记录的时间，返回按时间排序的时间列array('d')，不保留字典列表
+    """
     data_dir = Path(data_dir)
     if not data_dir.exists():
-        return []
+        return array('d')
+    
+    # 读取所有非final文件：scandir一次列出目录，DirEntry缓存stat结果，生成缓存键时不再逐个stat
+    with os.scandir(data_dir) as it:
+        file_paths = [e for e in it
+                      if e.name.startswith("edgex_continuous_") and e.name.endswith(".json")
+                      and "final" not in e.name and e.is_file()]
+    file_paths.sort(key=lambda e: e.name)
+    
+    # 源文件没有变化时直接使用上次过滤、排序好的结果
+    times_cache = cache_path(data_dir, CACHE_FILE_NAME)
+    key = cache_key(file_paths)
+    cached = load_columns(times_cache, key, 1)
+    if cached is not None:
+        return cached[0]
     
-    all_records = []
+    # 各文件在线程中并行读取解析，读取时就只保留ETH数据的时间
+    results = await asyncio.gather(*[asyncio.to_thread(_load_one, p) for p in file_paths])
     
-    # 读取所有非final文件
-    for file_path in sorted(data_dir.glob("edgex_continuous_*.json")):
-        if "final" in file_path.name:
+    times = array('d')
+    has_error = False
+    
+    for file_path, (file_times, error) in zip(file_paths, results):
+        if error is not None:
+            has_error = True
+            print(f"[WARNING] 读取文件失败 {file_path.name}: {error}")
             continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                records = json.load(f)
-                if isinstance(records, list):
-                    all_records.extend(records)
-        except Exception as e:
-            print(f"[WARNING] 读取文件失败 {file_path.name}: {e}")
+        times.extend(file_times)
     
     # 按时间排序
-    all_records.sort(key=lambda x: x.get('unix_time', 0))
-    
-    # 只保留ETH数据
-    eth_records = [r for r in all_records if r.get('contract_name') == 'ETHUSD']
+    times = array('d', sorted(times))
     
-    return eth_records
+    # 有文件读取失败时不写缓存，下次运行会重新尝试
+    if file_paths and not has_error:
+        save_columns(times_cache, key, (times,))
+    return times
+
+
+def _format_replay_time(record_time):
+    """格式化回放到的历史数据时间，尚未开始回放时显示'-'"""
+    if record_time is None:
+        return "-"
+    return datetime.fromtimestamp(record_time).strftime('%Y-%m-%d %H:%M:%S')
 
 
 async def fetch_orderbook_depth(client, contract_id, depth=15):
@@ -170,18 +281,20 @@ async def test_strategy_with_historical_data():
     # 加载历史数据
     data_dir = project_root / "edgex_data"
     print(f"[LOAD] 正在加载历史数据...")
-    historical_records = load_historical_data(data_dir)
+    record_times = await load_historical_data(data_dir)
     
-    if not historical_records:
+    if not record_times:
         print("[ERROR] 未找到历史数据文件")
         return False
     
-    print(f"[OK] 已加载 {len(historical_records)} 条历史记录")
-    print(f"   时间范围: {datetime.fromtimestamp(historical_records[0]['unix_time'])} 至 {datetime.fromtimestamp(historical_records[-1]['unix_time'])}")
+    print(f"[OK] 已加载 {len(record_times)} 条历史记录")
+    start_str, end_str = (datetime.fromtimestamp(record_times[i]) for i in (0, -1))
+    print(f"   时间范围: {start_str} 至 {end_str}")
     print()
     
+    client = None
     try:
-        # 初始化EdgeX客户端
+        # 初始化EdgeX客户端（整个测试只用这一个客户端，SDK内部的aiohttp会话保持长连接复用）
         print("[INIT] 正在初始化EdgeX客户端...")
         client = Client(
             base_url=base_url,
@@ -234,10 +347,14 @@ async def test_strategy_with_historical_data():
         print(f"   失衡阈值: {strategy.imbalance_threshold}")
         print()
         
+        # 计时统一使用事件循环的单调时钟
+        loop = asyncio.get_running_loop()
+        
         # 统计数据
         stats = {
-            'start_time': time.time(),
+            'start_time': loop.time(),
             'data_points_processed': 0,
+            'replay_time': None,  # 当前回放到的历史数据时间
             'orderbook_fetches': 0,
             'signals_generated': 0,
             'orders_placed': 0,
@@ -259,161 +376,211 @@ async def test_strategy_with_historical_data():
         
         test_duration = 300  # 测试5分钟
         end_time = stats['start_time'] + test_duration
-        last_orderbook_fetch = 0
         orderbook_fetch_interval = 5  # 每5秒获取一次订单簿深度
-        last_signal_check = 0
+        orderbook_retry_interval = 1  # 获取失败时1秒后重试
         signal_check_interval = 5  # 每5秒检查一次信号
         min_order_interval = 10  # 最小下单间隔10秒
         
         # 处理历史数据点（采样处理，不处理所有点）
-        sample_interval = max(1, len(historical_records) // 1000)  # 最多处理1000个点
+        sample_interval = max(1, len(record_times) // 1000)  # 最多处理1000个点
+        sampled_times = record_times[::sample_interval]
         
-        print(f"[INFO] 将处理 {len(historical_records) // sample_interval} 个数据点（采样间隔: {sample_interval}）")
+        print(f"[INFO] 将处理 {len(record_times) // sample_interval} 个数据点（采样间隔: {sample_interval}）")
         print()
         
-        record_index = 0
-        while time.time() < end_time and record_index < len(historical_records):
-            current_time = time.time()
+        async def place_order(signal, current_time):
+            """根据信号下单并检查订单状态"""
+            try:
+                print(f"\n[ORDER] 正在尝试开单...")
+                
+                # 计算订单价格
+                if signal['direction'] == 'buy':
+                    order_price = strategy.best_ask - strategy.tick_size
+                    side = OrderSide.BUY
+                else:
+                    order_price = strategy.best_bid + strategy.tick_size
+                    side = OrderSide.SELL
+                
+                # 四舍五入到tick_size
+                price_str = strategy.format_order_price(order_price)
+                
+                print(f"   订单方向: {signal['direction'].upper()}")
+                print(f"   订单价格: {price_str}")
+                print(f"   订单数量: {strategy.position_size_str}")
+                
+                # 下单
+                order_result = await client.create_limit_order(
+                    contract_id=eth_contract_id,
+                    size=strategy.position_size_str,
+                    price=price_str,
+                    side=side,
+                    post_only=True
+                )
+                
+                stats['orders_placed'] += 1
+                
+                if order_result and 'data' in order_result:
+                    order_id = order_result['data'].get('orderId')
+                    if order_id:
+                        print(f"[SUCCESS] 订单已提交!")
+                        print(f"   订单ID: {order_id}")
+                        
+                        # 检查订单状态：50ms后开始查询，只有请求出错或未返回data时才按指数退避重试；
+                        # 拿到活跃订单列表后不论是否包含本订单都停止（不在列表中说明已成交或取消）
+                        try:
+                            from edgex_sdk import GetActiveOrderParams
+                            order_params = GetActiveOrderParams(contract_id=eth_contract_id)
+                            
+                            active_orders = None
+                            for attempt in range(5):
+                                await asyncio.sleep(0.05 * 2 ** attempt)
+                                try:
+                                    active_orders = await client.trade.get_active_orders(order_params)
+                                except Exception:
+                                    if attempt == 4:
+                                        raise
+                                    continue
+                                if active_orders and 'data' in active_orders:
+                                    break
+                            
+                            # 查找我们的订单
+                            order_found = False
+                            if active_orders and 'data' in active_orders:
+                                order_id_str = str(order_id)
+                                for order in active_orders['data']:
+                                    if str(order.get('orderId')) == order_id_str:
+                                        order_found = True
+                                        order_status = order.get('status', 'UNKNOWN')
+                                        print(f"   订单状态: {order_status}")
+                                        
+                                        if order_status in ['OPEN', 'PARTIALLY_FILLED', 'FILLED']:
+                                            stats['orders_successful'] += 1
+                                            print(f"[SUCCESS] 订单成功! 状态: {order_status}")
+                                        else:
+                                            stats['orders_failed'] += 1
+                                            print(f"[WARNING] 订单状态异常: {order_status}")
+                                        break
+                            
+                            if not order_found:
+                                print(f"[INFO] 订单可能已成交或取消")
+                                stats['orders_successful'] += 1
+                        
+                        except Exception as e:
+                            print(f"[WARNING] 检查订单状态失败: {e}")
+                        
+                        stats['last_order_time'] = current_time
+                    else:
+                        print(f"[ERROR] 订单ID未返回")
+                        stats['orders_failed'] += 1
+                else:
+                    print(f"[ERROR] 下单失败: {order_result}")
+                    stats['orders_failed'] += 1
             
-            # 获取当前订单簿深度（定期更新）
-            if current_time - last_orderbook_fetch >= orderbook_fetch_interval:
+            except Exception as e:
+                print(f"[ERROR] 开单异常: {e}")
+                import traceback
+                traceback.print_exc()
+                stats['orders_failed'] += 1
+                stats['last_order_time'] = current_time
+        
+        # 订单簿获取和信号检查各自作为独立任务，按自己的间隔运行
+        stop_event = asyncio.Event()
+        orderbook_updated = asyncio.Event()
+        
+        async def orderbook_loop():
+            """定期获取订单簿深度，成功后通知信号任务"""
+            while not stop_event.is_set():
                 bids, asks = await fetch_orderbook_depth(client, eth_contract_id, strategy.orderbook_depth)
                 if bids and asks:
                     strategy.update_orderbook(bids, asks)
                     stats['orderbook_fetches'] += 1
-                    last_orderbook_fetch = current_time
-                    
-                    # 检查信号
-                    if current_time - last_signal_check >= signal_check_interval:
-                        last_signal_check = current_time
+                    orderbook_updated.set()
+                    await asyncio.sleep(orderbook_fetch_interval)
+                else:
+                    await asyncio.sleep(orderbook_retry_interval)
+        
+        async def signal_loop():
+            """订单簿更新后检查信号（至少间隔signal_check_interval秒），满足条件时下单"""
+            last_signal_check = None
+            while not stop_event.is_set():
+                await orderbook_updated.wait()
+                orderbook_updated.clear()
+                
+                current_time = loop.time()
+                if last_signal_check is not None and current_time - last_signal_check < signal_check_interval:
+                    continue
+                last_signal_check = current_time
+                
+                signal = strategy.generate_signal()
+                
+                if signal and signal['strength'] >= strategy.signal_strength_threshold:
+                    # 检查是否距离上次开单足够久
+                    if stats['last_order_time'] is None or \
+                       (current_time - stats['last_order_time']) >= min_order_interval:
                         
-                        signal = strategy.generate_signal()
+                        stats['signals_generated'] += 1
                         
-                        if signal and signal['strength'] >= strategy.signal_strength_threshold:
-                            # 检查是否距离上次开单足够久
-                            if stats['last_order_time'] is None or \
-                               (current_time - stats['last_order_time']) >= min_order_interval:
-                                
-                                stats['signals_generated'] += 1
-                                
-                                print(f"\n[SIGNAL] 检测到交易信号:")
-                                print(f"   方向: {signal['direction'].upper()}")
-                                print(f"   强度: {signal['strength']:.2%}")
-                                print(f"   失衡: {signal['imbalance']:.2%}")
-                                print(f"   价格: {signal['price']}")
-                                print(f"   最佳买价: {strategy.best_bid}")
-                                print(f"   最佳卖价: {strategy.best_ask}")
-                                
-                                # 尝试开单
-                                try:
-                                    print(f"\n[ORDER] 正在尝试开单...")
-                                    
-                                    # 计算订单价格
-                                    if signal['direction'] == 'buy':
-                                        order_price = strategy.best_ask - strategy.tick_size
-                                        side = OrderSide.BUY
-                                    else:
-                                        order_price = strategy.best_bid + strategy.tick_size
-                                        side = OrderSide.SELL
-                                    
-                                    # 四舍五入到tick_size
-                                    rounded_price = round(order_price / strategy.tick_size) * strategy.tick_size
-                                    
-                                    print(f"   订单方向: {signal['direction'].upper()}")
-                                    print(f"   订单价格: {rounded_price}")
-                                    print(f"   订单数量: {strategy.position_size}")
-                                    
-                                    # 下单
-                                    order_result = await client.create_limit_order(
-                                        contract_id=eth_contract_id,
-                                        size=str(strategy.position_size),
-                                        price=str(rounded_price),
-                                        side=side,
-                                        post_only=True
-                                    )
-                                    
-                                    stats['orders_placed'] += 1
-                                    
-                                    if order_result and 'data' in order_result:
-                                        order_id = order_result['data'].get('orderId')
-                                        if order_id:
-                                            print(f"[SUCCESS] 订单已提交!")
-                                            print(f"   订单ID: {order_id}")
-                                            
-                                            # 等待一小段时间检查订单状态
-                                            await asyncio.sleep(0.5)
-                                            
-                                            # 检查订单状态
-                                            try:
-                                                from edgex_sdk import GetActiveOrderParams
-                                                order_params = GetActiveOrderParams(contract_id=eth_contract_id)
-                                                active_orders = await client.trade.get_active_orders(order_params)
-                                                
-                                                # 查找我们的订单
-                                                order_found = False
-                                                if active_orders and 'data' in active_orders:
-                                                    for order in active_orders['data']:
-                                                        if str(order.get('orderId')) == str(order_id):
-                                                            order_found = True
-                                                            order_status = order.get('status', 'UNKNOWN')
-                                                            print(f"   订单状态: {order_status}")
-                                                            
-                                                            if order_status in ['OPEN', 'PARTIALLY_FILLED', 'FILLED']:
-                                                                stats['orders_successful'] += 1
-                                                                print(f"[SUCCESS] 订单成功! 状态: {order_status}")
-                                                            else:
-                                                                stats['orders_failed'] += 1
-                                                                print(f"[WARNING] 订单状态异常: {order_status}")
-                                                            break
-                                                
-                                                if not order_found:
-                                                    print(f"[INFO] 订单可能已成交或取消")
-                                                    stats['orders_successful'] += 1
-                                                    
-                                            except Exception as e:
-                                                print(f"[WARNING] 检查订单状态失败: {e}")
-                                            
-                                            stats['last_order_time'] = current_time
-                                        else:
-                                            print(f"[ERROR] 订单ID未返回")
-                                            stats['orders_failed'] += 1
-                                    else:
-                                        print(f"[ERROR] 下单失败: {order_result}")
-                                        stats['orders_failed'] += 1
-                                    
-                                except Exception as e:
-                                    print(f"[ERROR] 开单异常: {e}")
-                                    import traceback
-                                    traceback.print_exc()
-                                    stats['orders_failed'] += 1
-                                    stats['last_order_time'] = current_time
-            
-            # 处理历史数据点（用于显示进度）
-            if record_index < len(historical_records):
-                record = historical_records[record_index]
+                        print(f"\n[SIGNAL] 检测到交易信号:")
+                        print(f"   方向: {signal['direction'].upper()}")
+                        print(f"   强度: {signal['strength']:.2%}")
+                        print(f"   失衡: {signal['imbalance']:.2%}")
+                        print(f"   价格: {signal['price']}")
+                        print(f"   最佳买价: {strategy.best_bid}")
+                        print(f"   最佳卖价: {strategy.best_ask}")
+                        
+                        # 尝试开单
+                        await place_order(signal, current_time)
+        
+        async def progress_loop():
+            """每秒推进一个历史数据点（用于显示进度），数据用完时通知结束"""
+            for record_time in sampled_times:
+                # 处理历史数据点：记录数量和回放到的数据时间（用于显示进度）
                 stats['data_points_processed'] += 1
-                record_index += sample_interval
-            
-            # 每30秒打印一次统计
-            elapsed = current_time - stats['start_time']
-            if int(elapsed) % 30 == 0 and int(elapsed) > 0:
+                stats['replay_time'] = record_time
+                
+                await asyncio.sleep(1)
+            stop_event.set()
+        
+        async def stats_loop():
+            """每30秒打印一次统计"""
+            while not stop_event.is_set():
+                await asyncio.sleep(30)
+                elapsed = loop.time() - stats['start_time']
                 print(f"\n[STATS] 运行时间: {int(elapsed)}秒 | "
                       f"数据点: {stats['data_points_processed']} | "
+                      f"回放至: {_format_replay_time(stats['replay_time'])} | "
                       f"订单簿获取: {stats['orderbook_fetches']} | "
                       f"信号数: {stats['signals_generated']} | "
                       f"下单数: {stats['orders_placed']} | "
                       f"成功: {stats['orders_successful']} | "
                       f"失败: {stats['orders_failed']}")
-            
-            await asyncio.sleep(1)
         
+        tasks = [
+            asyncio.create_task(orderbook_loop()),
+            asyncio.create_task(signal_loop()),
+            asyncio.create_task(progress_loop()),
+            asyncio.create_task(stats_loop()),
+        ]
+        
+        try:
+            # 等待测试时长结束或历史数据用完，期间不再轮询
+            await asyncio.wait_for(stop_event.wait(), timeout=end_time - loop.time())
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            stop_event.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
         # 打印最终统计
-        total_time = time.time() - stats['start_time']
+        total_time = loop.time() - stats['start_time']
         print("\n" + "=" * 70)
         print("测试结果")
         print("=" * 70)
         print(f"总运行时间: {total_time:.1f}秒")
         print(f"处理数据点: {stats['data_points_processed']}")
+        print(f"回放至: {_format_replay_time(stats['replay_time'])}")
         print(f"订单簿获取次数: {stats['orderbook_fetches']}")
         print(f"生成信号数: {stats['signals_generated']}")
         print(f"尝试下单数: {stats['orders_placed']}")
@@ -424,9 +591,6 @@ async def test_strategy_with_historical_data():
             success_rate = stats['orders_successful'] / stats['orders_placed'] * 100
             print(f"成功率: {success_rate:.1f}%")
         
-        # 关闭客户端
-        await client.close()
-        
         print("\n" + "=" * 70)
         print("测试完成")
         print("=" * 70)
@@ -438,6 +602,10 @@ async def test_strategy_with_historical_data():
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        # 任何路径退出都关闭客户端，释放连接池
+        if client is not None:
+            await client.close()
 
 
 if __name__ == "__main__":
@@ -3,22 +3,24 @@
 """
 测试交易所API数据获取
 检查lighter和edgex是否能成功获取订单簿数据
+
+设置环境变量 LOG_LEVEL=DEBUG 可输出各个预期失败的完整堆栈
 """
 
+import os
 import sys
 import asyncio
+import logging
 from pathlib import Path
 from decimal import Decimal
-import dotenv
 
 # 添加项目路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 # 加载环境变量
-env_file = project_root / ".env"
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
+from _env import load_env
+if load_env():
     print("已加载 .env 文件")
 else:
     print("警告: 未找到 .env 文件")
@@ -26,6 +28,9 @@ print()
 
 from exchanges import ExchangeFactory
 
+# 预期内的失败（创建/连接/获取订单簿）只在开启DEBUG日志时输出堆栈，意外错误总是输出
+log = logging.getLogger(__name__)
+
 
 class SimpleConfig:
     """简单的配置对象，用于测试"""
@@ -57,43 +62,8 @@ async def test_exchange(exchange_name: str, ticker: str = 'ETH'):
         # 1. 尝试创建客户端
         print(f"1. 创建 {exchange_name} 客户端...")
         try:
-            # 创建配置对象（交易所客户端期望对象而不是字典）
-            config_obj = SimpleConfig(
-                contract_id=ticker,
-                ticker=ticker,
-                tick_size=Decimal('0.01'),
-                quantity=Decimal('0.1'),
-            )
-            
-            # 直接传递对象给ExchangeFactory（如果它接受对象）
-            # 如果不行，我们需要在初始化后替换
-            try:
-                client = ExchangeFactory.create_exchange(exchange_name, config_obj)
-            except TypeError:
-                # 如果ExchangeFactory不接受对象，先传字典，然后替换
-                config_dict = {
-                    'contract_id': ticker,
-                    'ticker': ticker,
-                    'tick_size': Decimal('0.01'),
-                    'quantity': Decimal('0.1'),
-                }
-                # 临时修改BaseExchangeClient来接受对象
-                from exchanges.base import BaseExchangeClient
-                original_init = BaseExchangeClient.__init__
-                def patched_init(self, config):
-                    if isinstance(config, dict):
-                        self.config = SimpleConfig(**config)
-                    else:
-                        self.config = config
-                    self._validate_config()
-                
-                # 应用补丁
-                BaseExchangeClient.__init__ = patched_init
-                try:
-                    client = ExchangeFactory.create_exchange(exchange_name, config_dict)
-                finally:
-                    # 恢复原始方法
-                    BaseExchangeClient.__init__ = original_init
+            # BaseExchangeClient直接保存传入的配置对象，属性访问式的配置对象可直接传给工厂
+            client = ExchangeFactory.create_exchange(exchange_name, exchange_config)
             print(f"   [OK] 客户端创建成功")
         except ImportError as e:
             print(f"   [FAIL] 导入失败: {e}")
@@ -108,8 +78,8 @@ async def test_exchange(exchange_name: str, ticker: str = 'ETH'):
             return False
         except Exception as e:
             print(f"   [FAIL] 创建失败: {e}")
-            import traceback
-            traceback.print_exc()
+            if log.isEnabledFor(logging.DEBUG):
+                log.exception("创建 %s 客户端失败", exchange_name)
             return False
         print()
         
@@ -120,8 +90,8 @@ async def test_exchange(exchange_name: str, ticker: str = 'ETH'):
             print(f"   [OK] 连接成功")
         except Exception as e:
             print(f"   [FAIL] 连接失败: {e}")
-            import traceback
-            traceback.print_exc()
+            if log.isEnabledFor(logging.DEBUG):
+                log.exception("连接 %s 交易所失败", exchange_name)
             return False
         print()
         
@@ -165,8 +135,8 @@ async def test_exchange(exchange_name: str, ticker: str = 'ETH'):
                 
         except Exception as e:
             print(f"   [FAIL] 获取数据失败: {e}")
-            import traceback
-            traceback.print_exc()
+            if log.isEnabledFor(logging.DEBUG):
+                log.exception("获取 %s 订单簿数据失败", exchange_name)
             success = False
         print()
         
@@ -183,8 +153,7 @@ async def test_exchange(exchange_name: str, ticker: str = 'ETH'):
         
     except Exception as e:
         print(f"[FAIL] 测试过程中出错: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("测试 %s 交易所时出错", exchange_name)
         return False
 
 
@@ -250,6 +219,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'WARNING').upper(), logging.WARNING),
+        format='%(levelname)s %(name)s: %(message)s'
+    )
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -1,27 +1,40 @@
 import json
+import os
 import sys
 from pathlib import Path
 
+# 优先用orjson解析（C实现，更快），未安装时回退到标准库json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # 强制刷新输出
 sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
 
 data_dir = Path('edgex_data')
-files = sorted([f for f in data_dir.glob('edgex_continuous_*.json') if 'final' not in f.name])
+# 只按文件名筛选、排序，最后只为首尾两个文件构造Path
+files = []
+if data_dir.is_dir():
+    with os.scandir(data_dir) as it:
+        files = sorted(e.name for e in it
+                       if e.name.startswith('edgex_continuous_') and e.name.endswith('.json')
+                       and 'final' not in e.name)
 
 if not files:
     print("No data files found")
     exit()
 
-first_file = files[0]
-last_file = files[-1]
+first_file = data_dir / files[0]
+last_file = data_dir / files[-1]
 
-with open(first_file, encoding='utf-8') as f:
-    first_data = json.load(f)
-with open(last_file, encoding='utf-8') as f:
-    last_data = json.load(f)
+first_data = _json_loads(first_file.read_bytes())
+last_data = first_data if last_file == first_file else _json_loads(last_file.read_bytes())
 
-eth_first = [r for r in first_data if r.get('contract_name') == 'ETHUSD'][0]
-eth_last = [r for r in last_data if r.get('contract_name') == 'ETHUSD'][-1]
+# 只需要首个/最后一个ETH记录：找到即停，不再生成过滤后的完整列表
+eth_first = next(r for r in first_data if r.get('contract_name') == 'ETHUSD')
+eth_last = next(r for r in reversed(last_data) if r.get('contract_name') == 'ETHUSD')
 
 first_price = eth_first['mid_price']
 last_price = eth_last['mid_price']
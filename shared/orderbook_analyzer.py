@@ -4,18 +4,23 @@
 分析订单簿深度、失衡、支撑阻力位等
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import List, Tuple, Dict, Optional
 from collections import deque
+from array import array
+from operator import mul
 import time
 
+# 加权失衡用的倒数权重 1/1, 1/2, ..., 1/256，只计算一次
+_INV_IDX = array('d', [1.0 / i for i in range(1, 257)])
+
 
 @dataclass
 class OrderBookLevel:
     """订单簿层级"""
-    price: Decimal
-    size: Decimal
+    price: float
+    size: float
     side: str  # 'bid' or 'ask'
 
 
@@ -25,8 +30,24 @@ class OrderBookSnapshot:
     bids: List[OrderBookLevel]
     asks: List[OrderBookLevel]
     timestamp: float
-    best_bid: Decimal
+    best_bid: Decimal  # 最优价保留Decimal，供策略计算下单价格
     best_ask: Decimal
+    # 按列存放的float价格/数量（SoA），分析计算只用这几列；未传入时由bids/asks生成
+    bid_px: Optional[array] = field(default=None, repr=False)
+    bid_sz: Optional[array] = field(default=None, repr=False)
+    ask_px: Optional[array] = field(default=None, repr=False)
+    ask_sz: Optional[array] = field(default=None, repr=False)
+    # 各档挂单价值（价格 * 数量），首次检测大单时计算一次
+    bid_value: Optional[array] = field(default=None, repr=False)
+    ask_value: Optional[array] = field(default=None, repr=False)
+    
+    def __post_init__(self):
+        if self.bid_px is None:
+            self.bid_px = array('d', [float(level.price) for level in self.bids])
+            self.bid_sz = array('d', [float(level.size) for level in self.bids])
+        if self.ask_px is None:
+            self.ask_px = array('d', [float(level.price) for level in self.asks])
+            self.ask_sz = array('d', [float(level.size) for level in self.asks])
     
     @property
     def mid_price(self) -> Decimal:
@@ -59,6 +80,8 @@ class OrderBookAnalyzer:
         self.depth = depth
         self.snapshots = deque(maxlen=100)  # 保存最近100个快照
         self.current_snapshot: Optional[OrderBookSnapshot] = None
+        # 综合指标缓存：id(快照) -> (快照, 指标)；保存快照引用，避免id被新对象复用后误命中
+        self._metrics_cache: Dict[int, Tuple[OrderBookSnapshot, Dict]] = {}
     
     def update_snapshot(self, bids: List[Tuple[Decimal, Decimal]], 
                        asks: List[Tuple[Decimal, Decimal]]) -> OrderBookSnapshot:
@@ -72,25 +95,39 @@ class OrderBookAnalyzer:
         Returns:
             OrderBookSnapshot: 订单簿快照
         """
+        bids = bids[:self.depth]
+        asks = asks[:self.depth]
+        
+        # 价格/数量直接从输入解析为float列；每个快照持有自己的array，不与其他快照共享缓冲区
+        bid_px = array('d', [float(price) for price, _ in bids])
+        bid_sz = array('d', [float(size) for _, size in bids])
+        ask_px = array('d', [float(price) for price, _ in asks])
+        ask_sz = array('d', [float(size) for _, size in asks])
+        
         # 转换为OrderBookLevel对象
         bid_levels = [
-            OrderBookLevel(price=Decimal(price), size=Decimal(size), side='bid')
-            for price, size in bids[:self.depth]
+            OrderBookLevel(price=price, size=size, side='bid')
+            for price, size in zip(bid_px, bid_sz)
         ]
         ask_levels = [
-            OrderBookLevel(price=Decimal(price), size=Decimal(size), side='ask')
-            for price, size in asks[:self.depth]
+            OrderBookLevel(price=price, size=size, side='ask')
+            for price, size in zip(ask_px, ask_sz)
         ]
         
-        best_bid = bid_levels[0].price if bid_levels else Decimal(0)
-        best_ask = ask_levels[0].price if ask_levels else Decimal(0)
+        # 只有最优价转换为Decimal（策略用它计算下单价格）
+        best_bid = Decimal(bids[0][0]) if bids else Decimal(0)
+        best_ask = Decimal(asks[0][0]) if asks else Decimal(0)
         
         snapshot = OrderBookSnapshot(
             bids=bid_levels,
             asks=ask_levels,
             timestamp=time.time(),
             best_bid=best_bid,
-            best_ask=best_ask
+            best_ask=best_ask,
+            bid_px=bid_px,
+            bid_sz=bid_sz,
+            ask_px=ask_px,
+            ask_sz=ask_sz
         )
         
         self.current_snapshot = snapshot
@@ -113,20 +150,10 @@ class OrderBookAnalyzer:
         if snapshot is None:
             snapshot = self.current_snapshot
         
-        if not snapshot or not snapshot.bids or not snapshot.asks:
-            return 0.0
-        
-        # 计算买卖双方的总量
-        bid_volume = sum(level.size for level in snapshot.bids)
-        ask_volume = sum(level.size for level in snapshot.asks)
-        
-        total_volume = bid_volume + ask_volume
-        if total_volume == 0:
+        if not snapshot:
             return 0.0
         
-        # 失衡比率 = (买单量 - 卖单量) / 总成交量
-        imbalance = float((bid_volume - ask_volume) / total_volume)
-        return imbalance
+        return _imbalance(snapshot.bid_sz, snapshot.ask_sz)
     
     def calculate_weighted_imbalance(self, snapshot: Optional[OrderBookSnapshot] = None,
                                     depth_levels: int = 5) -> float:
@@ -143,35 +170,12 @@ class OrderBookAnalyzer:
         if snapshot is None:
             snapshot = self.current_snapshot
         
-        if not snapshot or not snapshot.bids or not snapshot.asks:
-            return 0.0
-        
-        mid_price = snapshot.mid_price
-        if mid_price == 0:
-            return 0.0
-        
-        bid_weighted = Decimal(0)
-        ask_weighted = Decimal(0)
-        
-        # 计算买单加权总量
-        for i, level in enumerate(snapshot.bids[:depth_levels]):
-            # 距离越近权重越大（使用倒数）
-            weight = Decimal(1) / (i + 1)
-            bid_weighted += level.size * weight
-        
-        # 计算卖单加权总量
-        for i, level in enumerate(snapshot.asks[:depth_levels]):
-            weight = Decimal(1) / (i + 1)
-            ask_weighted += level.size * weight
-        
-        total_weighted = bid_weighted + ask_weighted
-        if total_weighted == 0:
+        if not snapshot:
             return 0.0
         
-        imbalance = float((bid_weighted - ask_weighted) / total_weighted)
-        return imbalance
+        return _weighted_imbalance(snapshot, depth_levels)
     
-    def find_support_resistance(self, snapshot: Optional[OrderBookSnapshot] = None) -> Tuple[Decimal, Decimal]:
+    def find_support_resistance(self, snapshot: Optional[OrderBookSnapshot] = None) -> Tuple[float, float]:
         """
         识别支撑位和阻力位
         
@@ -185,28 +189,16 @@ class OrderBookAnalyzer:
             snapshot = self.current_snapshot
         
         if not snapshot:
-            return Decimal(0), Decimal(0)
-        
-        # 支撑位：买单量最大的价格
-        support = Decimal(0)
-        max_bid_size = Decimal(0)
-        for level in snapshot.bids:
-            if level.size > max_bid_size:
-                max_bid_size = level.size
-                support = level.price
-        
-        # 阻力位：卖单量最大的价格
-        resistance = Decimal(0)
-        max_ask_size = Decimal(0)
-        for level in snapshot.asks:
-            if level.size > max_ask_size:
-                max_ask_size = level.size
-                resistance = level.price
+            return 0.0, 0.0
+        
+        # 支撑位：买单量最大的价格；阻力位：卖单量最大的价格（数量都为0时为0）
+        support = _price_at_max_size(snapshot.bid_px, snapshot.bid_sz)
+        resistance = _price_at_max_size(snapshot.ask_px, snapshot.ask_sz)
         
         return support, resistance
     
     def calculate_liquidity(self, snapshot: Optional[OrderBookSnapshot] = None,
-                           price_range_pct: float = 0.5) -> Dict[str, Decimal]:
+                           price_range_pct: float = 0.5) -> Dict[str, float]:
         """
         计算流动性指标
         
@@ -221,25 +213,9 @@ class OrderBookAnalyzer:
             snapshot = self.current_snapshot
         
         if not snapshot:
-            return {'bid_liquidity': Decimal(0), 'ask_liquidity': Decimal(0)}
-        
-        mid_price = snapshot.mid_price
-        if mid_price == 0:
-            return {'bid_liquidity': Decimal(0), 'ask_liquidity': Decimal(0)}
+            return {'bid_liquidity': 0.0, 'ask_liquidity': 0.0, 'total_liquidity': 0.0}
         
-        price_range = mid_price * Decimal(price_range_pct / 100)
-        bid_liquidity = Decimal(0)
-        ask_liquidity = Decimal(0)
-        
-        # 计算买单流动性（在价格范围内的总量）
-        for level in snapshot.bids:
-            if level.price >= mid_price - price_range:
-                bid_liquidity += level.size
-        
-        # 计算卖单流动性
-        for level in snapshot.asks:
-            if level.price <= mid_price + price_range:
-                ask_liquidity += level.size
+        bid_liquidity, ask_liquidity = _liquidity(snapshot, float(snapshot.mid_price), price_range_pct)
         
         return {
             'bid_liquidity': bid_liquidity,
@@ -248,7 +224,7 @@ class OrderBookAnalyzer:
         }
     
     def detect_large_orders(self, snapshot: Optional[OrderBookSnapshot] = None,
-                           threshold: Decimal = Decimal(50000)) -> Dict[str, List[OrderBookLevel]]:
+                           threshold: float = 50000.0) -> Dict[str, List[OrderBookLevel]]:
         """
         检测大单
         
@@ -265,20 +241,20 @@ class OrderBookAnalyzer:
         if not snapshot:
             return {'large_bids': [], 'large_asks': []}
         
-        large_bids = []
-        large_asks = []
+        # 挂单价值 = 价格 * 数量，每个快照只计算一次
+        if snapshot.bid_value is None:
+            snapshot.bid_value = array('d', map(mul, snapshot.bid_px, snapshot.bid_sz))
+            snapshot.ask_value = array('d', map(mul, snapshot.ask_px, snapshot.ask_sz))
         
-        # 检测买单大单
-        for level in snapshot.bids:
-            order_value = level.price * level.size
-            if order_value >= threshold:
-                large_bids.append(level)
+        threshold = float(threshold)
         
-        # 检测卖单大单
-        for level in snapshot.asks:
-            order_value = level.price * level.size
-            if order_value >= threshold:
-                large_asks.append(level)
+        # 大多数快照没有大单：先用max判断，没有达到阈值的档位时直接返回空列表
+        large_bids = []
+        if snapshot.bid_value and max(snapshot.bid_value) >= threshold:
+            large_bids = [snapshot.bids[i] for i, value in enumerate(snapshot.bid_value) if value >= threshold]
+        large_asks = []
+        if snapshot.ask_value and max(snapshot.ask_value) >= threshold:
+            large_asks = [snapshot.asks[i] for i, value in enumerate(snapshot.ask_value) if value >= threshold]
         
         return {
             'large_bids': large_bids,
@@ -301,23 +277,117 @@ class OrderBookAnalyzer:
         if not snapshot:
             return {}
         
-        imbalance = self.calculate_imbalance(snapshot)
-        weighted_imbalance = self.calculate_weighted_imbalance(snapshot)
-        support, resistance = self.find_support_resistance(snapshot)
-        liquidity = self.calculate_liquidity(snapshot)
+        # 同一快照重复获取时直接返回缓存（快照生成后不再修改）
+        hit = self._metrics_cache.get(id(snapshot))
+        if hit is not None and hit[0] is snapshot:
+            return hit[1]
+        
+        metrics = self._compute_all(snapshot)
+        
+        # 缓存条数与保存的快照数一致，超出时淘汰最早的
+        self._metrics_cache[id(snapshot)] = (snapshot, metrics)
+        if len(self._metrics_cache) > self.snapshots.maxlen:
+            del self._metrics_cache[next(iter(self._metrics_cache))]
+        
+        return metrics
+    
+    def _compute_all(self, snapshot: OrderBookSnapshot) -> Dict:
+        """
+        一次性计算快照的全部综合指标（失衡、加权失衡、支撑阻力、流动性及价差）
+        
+        中间价、价差等Decimal派生值只计算一次，供流动性等指标共用
+        
+        Args:
+            snapshot: 订单簿快照
+        
+        Returns:
+            Dict: 扁平的指标字典，字段与get_orderbook_metrics一致
+        """
+        # 最优价、中间价、价差（Decimal只在这里各计算一次）
+        mid = snapshot.mid_price
+        spread = snapshot.spread
+        spread_pct = (spread / mid) * 100 if mid > 0 else Decimal(0)
+        mid_price = float(mid)
+        
+        support = _price_at_max_size(snapshot.bid_px, snapshot.bid_sz)
+        resistance = _price_at_max_size(snapshot.ask_px, snapshot.ask_sz)
+        bid_liquidity, ask_liquidity = _liquidity(snapshot, mid_price, 0.5)
         
         return {
             'best_bid': float(snapshot.best_bid),
             'best_ask': float(snapshot.best_ask),
-            'mid_price': float(snapshot.mid_price),
-            'spread': float(snapshot.spread),
-            'spread_pct': float(snapshot.spread_pct),
-            'imbalance': imbalance,
-            'weighted_imbalance': weighted_imbalance,
-            'support': float(support),
-            'resistance': float(resistance),
-            'bid_liquidity': float(liquidity['bid_liquidity']),
-            'ask_liquidity': float(liquidity['ask_liquidity']),
-            'total_liquidity': float(liquidity['total_liquidity']),
+            'mid_price': mid_price,
+            'spread': float(spread),
+            'spread_pct': float(spread_pct),
+            'imbalance': _imbalance(snapshot.bid_sz, snapshot.ask_sz),
+            'weighted_imbalance': _weighted_imbalance(snapshot, 5),
+            'support': support,
+            'resistance': resistance,
+            'bid_liquidity': bid_liquidity,
+            'ask_liquidity': ask_liquidity,
+            'total_liquidity': bid_liquidity + ask_liquidity,
             'timestamp': snapshot.timestamp
         }
+
+
+def _imbalance(bid_sz: array, ask_sz: array) -> float:
+    """失衡比率 = (买单量 - 卖单量) / 总量，任一方为空或总量为0时返回0"""
+    if not bid_sz or not ask_sz:
+        return 0.0
+    
+    bid_volume = sum(bid_sz)
+    ask_volume = sum(ask_sz)
+    total_volume = bid_volume + ask_volume
+    if total_volume == 0:
+        return 0.0
+    
+    return (bid_volume - ask_volume) / total_volume
+
+
+def _weighted_imbalance(snapshot: OrderBookSnapshot, depth_levels: int) -> float:
+    """前depth_levels档按1/档位加权的失衡比率（距离越近权重越大）"""
+    if not snapshot.bid_sz or not snapshot.ask_sz:
+        return 0.0
+    
+    if snapshot.best_bid + snapshot.best_ask == 0:
+        return 0.0
+    
+    # 使用预先算好的倒数权重
+    if depth_levels <= len(_INV_IDX):
+        weights = _INV_IDX[:depth_levels]
+    else:
+        weights = array('d', [1.0 / i for i in range(1, depth_levels + 1)])
+    bid_weighted = sum(map(mul, snapshot.bid_sz, weights))
+    ask_weighted = sum(map(mul, snapshot.ask_sz, weights))
+    
+    total_weighted = bid_weighted + ask_weighted
+    if total_weighted == 0:
+        return 0.0
+    
+    return (bid_weighted - ask_weighted) / total_weighted
+
+
+def _liquidity(snapshot: OrderBookSnapshot, mid_price: float, price_range_pct: float) -> Tuple[float, float]:
+    """中间价上下price_range_pct范围内的买、卖挂单总量，中间价为0时都为0"""
+    if mid_price == 0:
+        return 0.0, 0.0
+    
+    price_range = mid_price * (price_range_pct / 100)
+    bid_floor = mid_price - price_range
+    ask_cap = mid_price + price_range
+    
+    bid_liquidity = sum(size for price, size in zip(snapshot.bid_px, snapshot.bid_sz) if price >= bid_floor)
+    ask_liquidity = sum(size for price, size in zip(snapshot.ask_px, snapshot.ask_sz) if price <= ask_cap)
+    
+    return float(bid_liquidity), float(ask_liquidity)
+
+
+def _price_at_max_size(prices: array, sizes: array) -> float:
+    """返回数量最大的档位价格（取第一个最大值），数量都不大于0时返回0"""
+    if not sizes:
+        return 0.0
+    # max和index都在C层完成；最大数量不大于0时无需再定位下标
+    max_size = max(sizes)
+    if max_size <= 0:
+        return 0.0
+    return prices[sizes.tolist().index(max_size)]
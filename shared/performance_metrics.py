@@ -5,20 +5,33 @@
 from decimal import Decimal
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from array import array
 import math
+import statistics
+
+# 可选：安装了numba时把回撤、连续盈亏的扫描循环编译为本地代码，未安装时使用纯Python实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def to_decimal(value: float) -> Decimal:
+    """float转换为Decimal（按十进制字符串转换，避免带出二进制误差），用于下单等对外接口"""
+    return Decimal(str(value))
 
 
 @dataclass
 class TradeRecord:
-    """交易记录"""
+    """交易记录（价格、数量、盈亏均为float）"""
     timestamp: float
     direction: str  # 'buy' or 'sell'
-    price: Decimal
-    size: Decimal
-    pnl: Decimal = Decimal(0)  # 该笔交易的盈亏
+    price: float
+    size: float
+    pnl: float = 0.0  # 该笔交易的盈亏
     
     @property
-    def value(self) -> Decimal:
+    def value(self) -> float:
         """交易价值"""
         return self.price * self.size
 
@@ -91,55 +104,64 @@ class PerformanceCalculator:
                 max_consecutive_losses=0
             )
         
+        initial = float(initial_balance)
+        
+        # 一次遍历完成所有逐笔累计：收集盈亏和时间戳序列（统计都用float计算，只在返回时转回Decimal），
+        # 同时统计盈亏笔数、总盈利/总亏损，并生成权益曲线（初始资金加上累计盈亏）
+        pnl = []
+        timestamps = []
+        equity_curve = []
+        winning_trades = 0
+        losing_trades = 0
+        total_profit = 0.0
+        total_loss = 0.0
+        running_balance = initial
+        
+        for trade in trades:
+            trade_pnl = trade.pnl
+            pnl.append(trade_pnl)
+            timestamps.append(trade.timestamp)
+            if trade_pnl > 0:
+                winning_trades += 1
+                total_profit += trade_pnl
+            elif trade_pnl < 0:
+                losing_trades += 1
+                total_loss -= trade_pnl
+            running_balance += trade_pnl
+            equity_curve.append(running_balance)
+        
         # 基础统计
         total_trades = len(trades)
-        winning_trades = sum(1 for t in trades if t.pnl > 0)
-        losing_trades = sum(1 for t in trades if t.pnl < 0)
         win_rate = winning_trades / total_trades if total_trades > 0 else 0.0
         
         # 盈亏统计
-        total_pnl = sum(t.pnl for t in trades)
-        total_return = float(total_pnl / initial_balance) if initial_balance > 0 else 0.0
+        total_pnl = total_profit - total_loss
+        total_return = total_pnl / initial if initial > 0 else 0.0
         
-        wins = [t.pnl for t in trades if t.pnl > 0]
-        losses = [abs(t.pnl) for t in trades if t.pnl < 0]
+        average_win = total_profit / winning_trades if winning_trades else 0.0
+        average_loss = total_loss / losing_trades if losing_trades else 0.0
         
-        average_win = Decimal(sum(wins) / len(wins)) if wins else Decimal(0)
-        average_loss = Decimal(sum(losses) / len(losses)) if losses else Decimal(0)
-        
-        total_profit = sum(wins) if wins else 0
-        total_loss = sum(losses) if losses else 0
         profit_factor = total_profit / total_loss if total_loss > 0 else float('inf') if total_profit > 0 else 0.0
         
         # 计算回撤
-        equity_curve = []
-        running_balance = initial_balance
-        for trade in trades:
-            running_balance += trade.pnl
-            equity_curve.append(float(running_balance))
-        
         max_drawdown, max_drawdown_duration = PerformanceCalculator._calculate_drawdown(
-            equity_curve, trades
+            equity_curve, timestamps
         )
         
         # 计算夏普比率和索提诺比率
-        returns = PerformanceCalculator._calculate_returns(trades, initial_balance)
+        returns = PerformanceCalculator._calculate_returns(pnl, initial)
         sharpe_ratio = PerformanceCalculator._calculate_sharpe_ratio(returns, risk_free_rate)
         sortino_ratio = PerformanceCalculator._calculate_sortino_ratio(returns, risk_free_rate)
         
-        # 计算平均持仓时间
-        if len(trades) >= 2:
-            holding_times = [
-                trades[i+1].timestamp - trades[i].timestamp
-                for i in range(len(trades) - 1)
-            ]
-            average_holding_time = sum(holding_times) / len(holding_times) if holding_times else 0.0
+        # 计算平均持仓时间（相邻交易间隔的平均值 = 首尾时间差 / 间隔数）
+        if total_trades >= 2:
+            average_holding_time = (timestamps[-1] - timestamps[0]) / (total_trades - 1)
         else:
             average_holding_time = 0.0
         
         # 计算最大连续盈亏
         max_consecutive_wins, max_consecutive_losses = PerformanceCalculator._calculate_consecutive(
-            trades
+            pnl
         )
         
         return PerformanceMetrics(
@@ -147,10 +169,10 @@ class PerformanceCalculator:
             winning_trades=winning_trades,
             losing_trades=losing_trades,
             win_rate=win_rate,
-            total_pnl=total_pnl,
+            total_pnl=to_decimal(total_pnl),
             total_return=total_return,
-            average_win=average_win,
-            average_loss=average_loss,
+            average_win=to_decimal(average_win),
+            average_loss=to_decimal(average_loss),
             profit_factor=profit_factor,
             max_drawdown=max_drawdown,
             max_drawdown_duration=max_drawdown_duration,
@@ -162,48 +184,28 @@ class PerformanceCalculator:
         )
     
     @staticmethod
-    def _calculate_drawdown(equity_curve: List[float], trades: List[TradeRecord]) -> Tuple[float, float]:
+    def _calculate_drawdown(equity_curve: List[float], timestamps: List[float]) -> Tuple[float, float]:
         """计算最大回撤"""
         if not equity_curve:
             return 0.0, 0.0
         
-        peak = equity_curve[0]
-        max_dd = 0.0
-        dd_start_time = None
-        max_dd_duration = 0.0
-        
-        for i, equity in enumerate(equity_curve):
-            if equity > peak:
-                peak = equity
-                dd_start_time = None
-            else:
-                dd = (peak - equity) / peak if peak > 0 else 0.0
-                if dd > max_dd:
-                    max_dd = dd
-                    if dd_start_time is None:
-                        dd_start_time = trades[i].timestamp if i < len(trades) else 0
-                
-                if dd_start_time and i < len(trades):
-                    duration = trades[i].timestamp - dd_start_time
-                    if duration > max_dd_duration:
-                        max_dd_duration = duration
-        
-        return max_dd, max_dd_duration
+        if njit is not None:
+            return _drawdown_kernel(array('d', equity_curve), array('d', timestamps))
+        return _drawdown_kernel(equity_curve, timestamps)
     
     @staticmethod
-    def _calculate_returns(trades: List[TradeRecord], initial_balance: Decimal) -> List[float]:
+    def _calculate_returns(pnl: List[float], initial_balance: float) -> List[float]:
         """计算收益率序列"""
-        if not trades:
+        if not pnl:
             return []
         
         returns = []
-        running_balance = float(initial_balance)
+        running_balance = initial_balance
         
-        for trade in trades:
+        for trade_pnl in pnl:
             if running_balance > 0:
-                return_pct = float(trade.pnl / Decimal(running_balance))
-                returns.append(return_pct)
-                running_balance += float(trade.pnl)
+                returns.append(trade_pnl / running_balance)
+                running_balance += trade_pnl
             else:
                 returns.append(0.0)
         
@@ -215,8 +217,9 @@ class PerformanceCalculator:
         if not returns or len(returns) < 2:
             return None
         
-        mean_return = sum(returns) / len(returns)
-        variance = sum((r - mean_return) ** 2 for r in returns) / (len(returns) - 1)
+        # 均值用statistics.fmean（C实现的fsum）；statistics.stdev内部走分数精确计算，较慢，方差仍自行累加
+        mean_return = statistics.fmean(returns)
+        variance = math.fsum((r - mean_return) * (r - mean_return) for r in returns) / (len(returns) - 1)
         std_dev = math.sqrt(variance)
         
         if std_dev == 0:
@@ -235,13 +238,20 @@ class PerformanceCalculator:
         if not returns or len(returns) < 2:
             return None
         
-        mean_return = sum(returns) / len(returns)
-        downside_returns = [r for r in returns if r < 0]
+        mean_return = statistics.fmean(returns)
         
-        if not downside_returns:
+        # 一次遍历累计下行收益的平方和与笔数，不再生成中间列表
+        downside_count = 0
+        downside_sq_sum = 0.0
+        for r in returns:
+            if r < 0:
+                downside_count += 1
+                downside_sq_sum += r * r
+        
+        if not downside_count:
             return None
         
-        downside_variance = sum(r ** 2 for r in downside_returns) / len(downside_returns)
+        downside_variance = downside_sq_sum / downside_count
         downside_std = math.sqrt(downside_variance)
         
         if downside_std == 0:
@@ -255,27 +265,73 @@ class PerformanceCalculator:
         return sortino
     
     @staticmethod
-    def _calculate_consecutive(trades: List[TradeRecord]) -> Tuple[int, int]:
+    def _calculate_consecutive(pnl: List[float]) -> Tuple[int, int]:
         """计算最大连续盈亏"""
-        if not trades:
+        if not pnl:
             return 0, 0
         
-        max_wins = 0
-        max_losses = 0
-        current_wins = 0
-        current_losses = 0
-        
-        for trade in trades:
-            if trade.pnl > 0:
-                current_wins += 1
-                current_losses = 0
-                max_wins = max(max_wins, current_wins)
-            elif trade.pnl < 0:
-                current_losses += 1
-                current_wins = 0
-                max_losses = max(max_losses, current_losses)
-            else:
-                current_wins = 0
-                current_losses = 0
-        
-        return max_wins, max_losses
+        if njit is not None:
+            return _consecutive_kernel(array('d', pnl))
+        return _consecutive_kernel(pnl)
+
+
+def _drawdown_kernel(equity_curve, timestamps):
+    """最大回撤及其持续时间的扫描循环（只用标量float运算，可被numba编译）"""
+    n = min(len(equity_curve), len(timestamps))
+    peak = equity_curve[0]
+    max_dd = 0.0
+    has_dd_start = False
+    dd_start_time = 0.0
+    max_dd_duration = 0.0
+    
+    for i in range(len(equity_curve)):
+        equity = equity_curve[i]
+        if equity > peak:
+            peak = equity
+            has_dd_start = False
+        else:
+            dd = (peak - equity) / peak if peak > 0 else 0.0
+            if dd > max_dd:
+                max_dd = dd
+                if not has_dd_start:
+                    has_dd_start = True
+                    dd_start_time = timestamps[i] if i < n else 0.0
+            
+            # 回撤起点时间为0时视为未记录（与原先的真值判断一致）
+            if has_dd_start and dd_start_time != 0.0 and i < n:
+                duration = timestamps[i] - dd_start_time
+                if duration > max_dd_duration:
+                    max_dd_duration = duration
+    
+    return max_dd, max_dd_duration
+
+
+def _consecutive_kernel(pnl):
+    """最大连续盈利/亏损笔数的扫描循环（可被numba编译）"""
+    max_wins = 0
+    max_losses = 0
+    current_wins = 0
+    current_losses = 0
+    
+    for i in range(len(pnl)):
+        p = pnl[i]
+        if p > 0:
+            current_wins += 1
+            current_losses = 0
+            if current_wins > max_wins:
+                max_wins = current_wins
+        elif p < 0:
+            current_losses += 1
+            current_wins = 0
+            if current_losses > max_losses:
+                max_losses = current_losses
+        else:
+            current_wins = 0
+            current_losses = 0
+    
+    return max_wins, max_losses
+
+
+if njit is not None:
+    _drawdown_kernel = njit(cache=True)(_drawdown_kernel)
+    _consecutive_kernel = njit(cache=True)(_consecutive_kernel)
@@ -8,7 +8,7 @@ import asyncio
 import time
 from decimal import Decimal
 from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from exchanges import ExchangeFactory
 from helpers import TradingLogger
@@ -81,11 +81,11 @@ class MarketMakerStrategy:
             # 获取合约信息
             if hasattr(self.exchange_client, 'get_contract_attributes'):
                 contract_id, tick_size = await self.exchange_client.get_contract_attributes()
-                self.config.contract_id = contract_id
+                self.config = replace(self.config, contract_id=contract_id)
                 self.exchange_client.config.contract_id = contract_id
                 self.exchange_client.config.tick_size = tick_size
             else:
-                self.config.contract_id = self.config.ticker
+                self.config = replace(self.config, contract_id=self.config.ticker)
             
             await self.exchange_client.connect()
             self.logger.log("做市商策略初始化成功", "INFO")
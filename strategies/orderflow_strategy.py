@@ -8,7 +8,7 @@ import asyncio
 import time
 from decimal import Decimal
 from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from exchanges import ExchangeFactory
 from helpers import TradingLogger
@@ -93,13 +93,13 @@ class OrderFlowStrategy:
             # 获取合约信息（contract_id和tick_size）
             if hasattr(self.exchange_client, 'get_contract_attributes'):
                 contract_id, tick_size = await self.exchange_client.get_contract_attributes()
-                self.config.contract_id = contract_id
+                self.config = replace(self.config, contract_id=contract_id)
                 # 更新exchange_client的配置
                 self.exchange_client.config.contract_id = contract_id
                 self.exchange_client.config.tick_size = tick_size
             else:
                 # 如果交易所不支持，尝试从ticker推断
-                self.config.contract_id = self.config.ticker
+                self.config = replace(self.config, contract_id=self.config.ticker)
             
             await self.exchange_client.connect()
             self.logger.log("订单流策略初始化成功", "INFO")
@@ -14,6 +14,7 @@ import csv
 import os
 from pathlib import Path
 from decimal import Decimal
+from dataclasses import replace
 from datetime import datetime
 import dotenv
 
@@ -107,7 +108,8 @@ class LighterMarketMakerBot:
             # 获取合约信息
             if hasattr(self.strategy.exchange_client, 'get_contract_attributes'):
                 contract_id, tick_size = await self.strategy.exchange_client.get_contract_attributes()
-                self.config.contract_id = contract_id
+                # 配置不可变：生成新的配置对象，并与策略共用同一份
+                self.config = self.strategy.config = replace(self.config, contract_id=contract_id)
                 self.strategy.exchange_client.config.contract_id = contract_id
                 self.strategy.exchange_client.config.tick_size = tick_size
             